@@ -1,43 +1,96 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Blueprint, Response, current_app, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
 from flask_migrate import Migrate
-from flask_mail import Mail, Message
+from flask_mail import Mail
+from sqlalchemy import insert, update, delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
 from config import Config
 from models import db, User, KOL, Campaign, InfluencerInvite
+from kol_snapshot import KOLSnapshot, SORT_COLUMNS
+from kol_facets import KOLFacets
+from kol_dedup import KOLDedup
+from kol_search import KOLSearch
+from change_feed import ChangeFeed, record_changes, record_deletes
+from image_cache import ImageCache, ImageFetchError
+from mailer import INVITE_EXPIRES_DAYS, invite_message, send_invites_command
+from seeder import seed_command
+from query_guard import QueryGuard
 from datetime import datetime, timedelta
+import math
 import requests
-import os
 
-app = Flask(__name__)
-app.config.from_object(Config)
+# Extensions are created unbound and attached to an app in create_app()
+cors = CORS()
+migrate = Migrate()
+jwt = JWTManager()
+mail = Mail()
+kol_snapshot = KOLSnapshot()
+kol_facets = KOLFacets()
+kol_dedup = KOLDedup()
+change_feed = ChangeFeed()
+kol_search = KOLSearch()
+image_cache = ImageCache()
+query_guard = QueryGuard()
 
-# Mail configuration
-app.config['MAIL_SERVER'] = os.getenv('MAIL_SERVER', 'smtp.gmail.com')
-app.config['MAIL_PORT'] = int(os.getenv('MAIL_PORT', 587))
-app.config['MAIL_USE_TLS'] = os.getenv('MAIL_USE_TLS', 'True') == 'True'
-app.config['MAIL_USERNAME'] = os.getenv('MAIL_USERNAME')
-app.config['MAIL_PASSWORD'] = os.getenv('MAIL_PASSWORD')
-app.config['MAIL_DEFAULT_SENDER'] = os.getenv('MAIL_DEFAULT_SENDER', 'noreply@kolplatform.com')
+api = Blueprint('api', __name__)
 
-# Instagram API configuration
-app.config['INSTAGRAM_APP_ID'] = os.getenv('INSTAGRAM_APP_ID')
-app.config['INSTAGRAM_APP_SECRET'] = os.getenv('INSTAGRAM_APP_SECRET')
-app.config['INSTAGRAM_REDIRECT_URI'] = os.getenv('INSTAGRAM_REDIRECT_URI', 'http://localhost:3000/influencer/instagram-callback')
 
-CORS(app)
-db.init_app(app)
-migrate = Migrate(app, db)
-jwt = JWTManager(app)
-mail = Mail(app)
+def create_app(config_class=Config):
+    """Application factory.
 
-# Create tables
-with app.app_context():
-    db.create_all()
+    Only wires up configuration and extensions; nothing here touches the
+    database. Schema changes are applied with ``flask db upgrade``.
+    """
+    app = Flask(__name__)
+    app.config.from_object(config_class)
+    
+    cors.init_app(app)
+    db.init_app(app)
+    migrate.init_app(app, db)
+    jwt.init_app(app)
+    mail.init_app(app)
+    kol_snapshot.init_app(app)
+    kol_facets.init_app(app)
+    kol_dedup.init_app(app)
+    change_feed.init_app(app)
+    kol_search.init_app(app)
+    image_cache.init_app(app)
+    query_guard.init_app(app)
+    
+    app.register_blueprint(api)
+    app.cli.add_command(send_invites_command)
+    app.cli.add_command(seed_command)
+    
+    return app
+
+
+def dispose_engines(app):
+    """Drop pooled connections inherited from a parent process.
+
+    Called in each gunicorn worker after fork so workers never share a
+    connection opened by the preloading master.
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+
+def kol_changed(kol_id):
+    """Drop this process's cached KOL reads and reindex the KOL after a write."""
+    kol_snapshot.invalidate()
+    kol_facets.invalidate()
+    
+    try:
+        kol_dedup.index_kol(kol_id)
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error updating dedup index: {str(e)}")
 
 
 # Auth endpoints
-@app.route('/api/auth/register', methods=['POST'])
+@api.route('/api/auth/register', methods=['POST'])
 def register():
     data = request.get_json()
     
@@ -63,7 +116,7 @@ def register():
     }), 201
 
 
-@app.route('/api/auth/login', methods=['POST'])
+@api.route('/api/auth/login', methods=['POST'])
 def login():
     data = request.get_json()
     user = User.query.filter_by(email=data.get('email')).first()
@@ -79,7 +132,7 @@ def login():
     }), 200
 
 
-@app.route('/api/auth/me', methods=['GET'])
+@api.route('/api/auth/me', methods=['GET'])
 @jwt_required()
 def get_current_user():
     user_id = int(get_jwt_identity())
@@ -92,36 +145,186 @@ def get_current_user():
 
 
 # KOL endpoints
-@app.route('/api/kols', methods=['GET'])
+def kol_filters():
+    """Read the `get_kols` filter parameters from the query string."""
+    return {
+        'category': request.args.get('category'),
+        'platform': request.args.get('platform'),
+        'min_followers': request.args.get('min_followers', type=int),
+        'max_price': request.args.get('max_price', type=float)
+    }
+
+
+def apply_kol_filters(query, filters):
+    """Apply `kol_filters()` to a KOL query."""
+    if filters['category']:
+        query = query.filter_by(category=filters['category'])
+    if filters['platform']:
+        query = query.filter_by(platform=filters['platform'])
+    if filters['min_followers']:
+        query = query.filter(KOL.followers >= filters['min_followers'])
+    if filters['max_price']:
+        query = query.filter(KOL.price_per_post <= filters['max_price'])
+    return query
+
+
+@api.route('/api/kols', methods=['GET'])
 def get_kols():
     # Query parameters for filtering
-    category = request.args.get('category')
-    platform = request.args.get('platform')
-    min_followers = request.args.get('min_followers', type=int)
-    max_price = request.args.get('max_price', type=float)
-    
-    query = KOL.query
-    
-    if category:
-        query = query.filter_by(category=category)
-    if platform:
-        query = query.filter_by(platform=platform)
-    if min_followers:
-        query = query.filter(KOL.followers >= min_followers)
-    if max_price:
-        query = query.filter(KOL.price_per_post <= max_price)
+    filters = kol_filters()
+    
+    # Optional sorting and paging
+    sort = request.args.get('sort')
+    order = request.args.get('order', 'asc')
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    limit = request.args.get('limit', type=int)
+    
+    if sort and sort not in SORT_COLUMNS:
+        return jsonify({'error': f"sort must be one of: {', '.join(SORT_COLUMNS)}"}), 400
+    if limit is not None and limit < 0:
+        return jsonify({'error': 'limit must not be negative'}), 400
+    
+    # Answer paged requests from the in-memory snapshot when it is enabled;
+    # unbounded ones would load every matching row by id, so SQL is cheaper
+    page_ids = kol_snapshot.search(
+        current_app.config,
+        sort=sort,
+        order=order,
+        offset=offset,
+        limit=limit,
+        **filters
+    ) if limit is not None else None
+    if page_ids is not None:
+        rows = {kol.id: kol for kol in KOL.query.filter(KOL.id.in_(page_ids)).all()} if page_ids else {}
+        return jsonify([rows[kol_id].to_dict() for kol_id in page_ids if kol_id in rows]), 200
+    
+    query = apply_kol_filters(KOL.query, filters)
+    
+    if sort:
+        column = getattr(KOL, sort)
+        # NULLs last in both directions, as the snapshot sorts them
+        ordering = column.desc() if order == 'desc' else column.asc()
+        query = query.order_by(ordering.nulls_last(), KOL.id)
+    elif offset or limit is not None:
+        query = query.order_by(KOL.id)
+    if offset or limit is not None:
+        query = query.offset(offset).limit(limit)
     
     kols = query.all()
     return jsonify([kol.to_dict() for kol in kols]), 200
 
 
-@app.route('/api/kols/<int:kol_id>', methods=['GET'])
+def filtered_kol_ids(filters):
+    """Sorted ids of the KOLs matching `kol_filters()` for restricting a search.
+
+    Returns None when more than KOL_SEARCH_MAX_FILTER_IDS match in SQL; such
+    filters are unselective enough to apply after ranking.
+    """
+    ids = kol_snapshot.matching_ids(current_app.config, **filters)
+    if ids is not None:
+        return ids
+    
+    cap = current_app.config['KOL_SEARCH_MAX_FILTER_IDS']
+    query = apply_kol_filters(db.session.query(KOL.id), filters).order_by(KOL.id).limit(cap + 1)
+    ids = [kol_id for (kol_id,) in query]
+    return ids if len(ids) <= cap else None
+
+
+@api.route('/api/kols/search', methods=['GET'])
+def search_kols():
+    """Free-text semantic search over KOL bios and names, combined with the get_kols filters"""
+    text = request.args.get('q', '').strip()
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+    
+    if not text:
+        return jsonify({'error': 'q is required'}), 400
+    
+    if not kol_search.available():
+        return jsonify({'error': 'Search index has not been built'}), 503
+    
+    # Rank only KOLs that pass the filters, so selective filters still fill the page
+    filters = kol_filters()
+    allowed = filtered_kol_ids(filters) if any(filters.values()) else None
+    oversample = 10
+    
+    while True:
+        scored = kol_search.search(text, limit=limit, oversample=oversample, allowed=allowed)
+        if not scored:
+            return jsonify([]), 200
+        
+        # Filters are checked again where the rows are loaded; with `allowed` this only
+        # drops KOLs changed since the snapshot refreshed
+        query = apply_kol_filters(KOL.query.filter(KOL.id.in_([kol_id for kol_id, _ in scored])), filters)
+        kols = {kol.id: kol for kol in query.all()}
+        results = [(kols[kol_id], score) for kol_id, score in scored if kol_id in kols]
+        
+        # Unrestricted filters are applied after ranking; widen until the page is full
+        if len(results) >= limit or len(scored) < limit * oversample:
+            break
+        oversample *= 4
+    
+    return jsonify([
+        {'kol': kol.to_dict(), 'score': round(score, 4)} for kol, score in results[:limit]
+    ]), 200
+
+
+@api.route('/api/kols/facets', methods=['GET'])
+def get_kol_facets():
+    """Counts per category, platform, follower and price bucket for the current filters"""
+    return jsonify(kol_facets.counts(current_app.config, kol_snapshot, **kol_filters())), 200
+
+
+@api.route('/api/kols/duplicates', methods=['GET'])
+@jwt_required()
+def get_kol_duplicates():
+    """Candidate duplicate clusters (admin only)"""
+    user_id = int(get_jwt_identity())
+    user = User.query.get(user_id)
+    
+    if user.role != 'admin':
+        return jsonify({'error': 'Only admins can view duplicates'}), 403
+    
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+    
+    clusters = kol_dedup.clusters(offset=offset, limit=limit)
+    member_ids = [kol_id for members in clusters.values() for kol_id in members]
+    kols = {kol.id: kol for kol in KOL.query.filter(KOL.id.in_(member_ids)).all()} if member_ids else {}
+    
+    return jsonify([
+        {
+            'cluster_id': cluster_id,
+            'kols': [kols[kol_id].to_dict() for kol_id in members if kol_id in kols]
+        }
+        for cluster_id, members in clusters.items()
+    ]), 200
+
+
+@api.route('/api/kols/<int:kol_id>', methods=['GET'])
 def get_kol(kol_id):
     kol = KOL.query.get_or_404(kol_id)
     return jsonify(kol.to_dict()), 200
 
 
-@app.route('/api/kols', methods=['POST'])
+@api.route('/api/kols/<int:kol_id>/similar', methods=['GET'])
+def get_similar_kols(kol_id):
+    """KOLs that look like the same creator or a close lookalike"""
+    kol = KOL.query.get_or_404(kol_id)
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 50)
+    
+    if not kol_dedup.enabled():
+        return jsonify([]), 200
+    
+    scored = kol_dedup.similar(kol, limit=limit)
+    kols = {other.id: other for other in KOL.query.filter(KOL.id.in_([other_id for other_id, _ in scored])).all()} if scored else {}
+    
+    return jsonify([
+        {'kol': kols[other_id].to_dict(), 'score': round(score, 3)}
+        for other_id, score in scored if other_id in kols
+    ]), 200
+
+
+@api.route('/api/kols', methods=['POST'])
 @jwt_required()
 def create_kol():
     user_id = int(get_jwt_identity())
@@ -148,11 +351,12 @@ def create_kol():
     
     db.session.add(kol)
     db.session.commit()
+    kol_changed(kol.id)
     
     return jsonify(kol.to_dict()), 201
 
 
-@app.route('/api/kols/<int:kol_id>', methods=['PUT'])
+@api.route('/api/kols/<int:kol_id>', methods=['PUT'])
 @jwt_required()
 def update_kol(kol_id):
     user_id = int(get_jwt_identity())
@@ -177,11 +381,12 @@ def update_kol(kol_id):
     kol.verified = data.get('verified', kol.verified)
     
     db.session.commit()
+    kol_changed(kol_id)
     
     return jsonify(kol.to_dict()), 200
 
 
-@app.route('/api/kols/<int:kol_id>', methods=['DELETE'])
+@api.route('/api/kols/<int:kol_id>', methods=['DELETE'])
 @jwt_required()
 def delete_kol(kol_id):
     user_id = int(get_jwt_identity())
@@ -194,27 +399,61 @@ def delete_kol(kol_id):
     kol = KOL.query.get_or_404(kol_id)
     db.session.delete(kol)
     db.session.commit()
+    kol_changed(kol_id)
     
     return jsonify({'message': 'KOL deleted successfully'}), 200
 
 
+# Profile image proxy
+@api.route('/api/images/<token>', methods=['GET'])
+def get_image(token):
+    """Serve a cached thumbnail of a KOL profile image"""
+    url = image_cache.source_url(token)
+    
+    if not url:
+        return jsonify({'error': 'Image not found'}), 404
+    
+    if not image_cache.available():
+        return jsonify({'error': 'Image processing is not available'}), 503
+    
+    size = request.args.get('size', 256, type=int)
+    sizes = current_app.config['IMAGE_THUMBNAIL_SIZES']
+    if size not in sizes:
+        return jsonify({'error': f"size must be one of: {', '.join(str(s) for s in sizes)}"}), 400
+    
+    try:
+        path, etag = image_cache.thumbnail(url, size)
+    except ImageFetchError as e:
+        # The reason can describe internal hosts; keep it in the server log
+        print(f"Image fetch failed: {e}")
+        return jsonify({'error': 'Failed to fetch image'}), 502
+    
+    # Token and size pin the content, so the response never changes
+    response = send_file(path, mimetype='image/jpeg', etag=etag, max_age=365 * 24 * 3600, conditional=True)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
 # Campaign endpoints
-@app.route('/api/campaigns', methods=['GET'])
+@api.route('/api/campaigns', methods=['GET'])
 @jwt_required()
 def get_campaigns():
     user_id = int(get_jwt_identity())
-    campaigns = Campaign.query.filter_by(user_id=user_id).all()
+    # to_dict includes the KOL; load them in one query instead of one per campaign
+    campaigns = Campaign.for_user(user_id).options(db.selectinload(Campaign.kol)).all()
     return jsonify([campaign.to_dict() for campaign in campaigns]), 200
 
 
-@app.route('/api/campaigns/<int:campaign_id>', methods=['GET'])
+@api.route('/api/campaigns/<int:campaign_id>', methods=['GET'])
 @jwt_required()
 def get_campaign(campaign_id):
-    campaign = Campaign.query.get_or_404(campaign_id)
+    user_id = int(get_jwt_identity())
+    campaign = Campaign.for_user(user_id).filter_by(id=campaign_id).first_or_404()
     return jsonify(campaign.to_dict()), 200
 
 
-@app.route('/api/campaigns', methods=['POST'])
+@api.route('/api/campaigns', methods=['POST'])
 @jwt_required()
 def create_campaign():
     user_id = int(get_jwt_identity())
@@ -237,10 +476,11 @@ def create_campaign():
     return jsonify(campaign.to_dict()), 201
 
 
-@app.route('/api/campaigns/<int:campaign_id>', methods=['PUT'])
+@api.route('/api/campaigns/<int:campaign_id>', methods=['PUT'])
 @jwt_required()
 def update_campaign(campaign_id):
-    campaign = Campaign.query.get_or_404(campaign_id)
+    user_id = int(get_jwt_identity())
+    campaign = Campaign.for_user(user_id).filter_by(id=campaign_id).first_or_404()
     data = request.get_json()
     
     campaign.title = data.get('title', campaign.title)
@@ -260,25 +500,233 @@ def update_campaign(campaign_id):
     return jsonify(campaign.to_dict()), 200
 
 
-@app.route('/api/campaigns/<int:campaign_id>', methods=['DELETE'])
+@api.route('/api/campaigns/<int:campaign_id>', methods=['DELETE'])
 @jwt_required()
 def delete_campaign(campaign_id):
-    campaign = Campaign.query.get_or_404(campaign_id)
+    user_id = int(get_jwt_identity())
+    campaign = Campaign.for_user(user_id).filter_by(id=campaign_id).first_or_404()
     db.session.delete(campaign)
     db.session.commit()
     
     return jsonify({'message': 'Campaign deleted successfully'}), 200
 
 
+# Batch campaign endpoints
+CAMPAIGN_FIELDS = ('title', 'description', 'budget', 'start_date', 'end_date', 'status', 'kol_id')
+CAMPAIGN_STATUSES = ('draft', 'active', 'completed', 'cancelled')
+
+
+def campaign_batch(data, key):
+    """Return the list of batch items under `key`, or an error response."""
+    items = (data or {}).get(key)
+    
+    if not isinstance(items, list) or not items:
+        return None, (jsonify({'error': f'{key} must be a non-empty list'}), 400)
+    
+    limit = current_app.config['CAMPAIGN_BATCH_MAX']
+    if len(items) > limit:
+        return None, (jsonify({'error': f'At most {limit} items per batch'}), 400)
+    
+    return items, None
+
+
+def campaign_values(item, kol_ids):
+    """Convert one batch item into column values, raising ValueError if invalid."""
+    if not isinstance(item, dict):
+        raise ValueError('Item must be an object')
+    
+    values = {field: item[field] for field in CAMPAIGN_FIELDS if field in item}
+    
+    if 'title' in values and (not isinstance(values['title'], str) or not values['title'].strip()):
+        raise ValueError('Title must be a non-empty string')
+    
+    if values.get('description') is not None and not isinstance(values['description'], str):
+        raise ValueError('Description must be a string')
+    
+    if 'budget' in values:
+        # float() also accepts numeric strings; booleans and NaN/inf are rejected
+        try:
+            if isinstance(values['budget'], bool):
+                raise TypeError
+            values['budget'] = float(values['budget'])
+        except (TypeError, ValueError):
+            raise ValueError('Budget must be a number') from None
+        if not math.isfinite(values['budget']):
+            raise ValueError('Budget must be a number')
+    
+    if 'status' in values and values['status'] not in CAMPAIGN_STATUSES:
+        raise ValueError(f"Status must be one of: {', '.join(CAMPAIGN_STATUSES)}")
+    
+    # Empty dates mean none, as in create_campaign
+    for field in ('start_date', 'end_date'):
+        if field in values:
+            values[field] = datetime.fromisoformat(values[field]) if values[field] else None
+    
+    if values.get('kol_id') is not None and values['kol_id'] not in kol_ids:
+        raise ValueError(f"KOL {values['kol_id']} not found")
+    
+    return values
+
+
+def existing_kol_ids(items):
+    """Look up every kol_id referenced by the batch in one query."""
+    requested = {item.get('kol_id') for item in items if isinstance(item, dict)
+                 and isinstance(item.get('kol_id'), int)}
+    if not requested:
+        return set()
+    return {kol_id for (kol_id,) in db.session.query(KOL.id).filter(KOL.id.in_(requested))}
+
+
+def owned_campaign_ids(user_id, campaign_ids):
+    """Return the subset of `campaign_ids` that belongs to the user, in one query."""
+    return {campaign_id for (campaign_id,) in Campaign.for_user(user_id).filter(
+        Campaign.id.in_(campaign_ids)
+    ).with_entities(Campaign.id)}
+
+
+@api.route('/api/campaigns/batch', methods=['POST'])
+@jwt_required()
+def create_campaigns_batch():
+    """Create many campaigns in one transaction"""
+    user_id = int(get_jwt_identity())
+    items, error = campaign_batch(request.get_json(), 'campaigns')
+    if error:
+        return error
+    
+    kol_ids = existing_kol_ids(items)
+    now = datetime.utcnow()
+    results = [None] * len(items)
+    rows = []
+    positions = []
+    
+    for index, item in enumerate(items):
+        try:
+            values = campaign_values(item, kol_ids)
+            if 'title' not in values:
+                raise ValueError('Title is required')
+        except (TypeError, ValueError) as e:
+            results[index] = {'index': index, 'status': 'error', 'error': str(e)}
+            continue
+        
+        values.setdefault('budget', 0.0)
+        values.setdefault('status', 'draft')
+        values.update(user_id=user_id, created_at=now, updated_at=now)
+        rows.append(values)
+        positions.append(index)
+    
+    if rows:
+        # Every row needs the same keys for a single executemany
+        for row in rows:
+            for field in CAMPAIGN_FIELDS:
+                row.setdefault(field, None)
+        
+        new_ids = db.session.scalars(insert(Campaign).returning(Campaign.id, sort_by_parameter_order=True), rows).all()
+        record_changes('insert', Campaign.for_user(user_id).filter(Campaign.id.in_(new_ids)).all())
+        db.session.commit()
+        
+        for index, campaign_id in zip(positions, new_ids):
+            results[index] = {'index': index, 'status': 'created', 'id': campaign_id}
+    
+    # Nothing was created when every item was invalid
+    return jsonify({'results': results}), 201 if rows else 400
+
+
+@api.route('/api/campaigns/batch', methods=['PUT'])
+@jwt_required()
+def update_campaigns_batch():
+    """Update many campaigns in one transaction; each item needs an id"""
+    user_id = int(get_jwt_identity())
+    items, error = campaign_batch(request.get_json(), 'campaigns')
+    if error:
+        return error
+    
+    requested = [item.get('id') for item in items if isinstance(item, dict)]
+    if not all(isinstance(campaign_id, int) for campaign_id in requested) or len(requested) != len(items):
+        return jsonify({'error': 'Every item needs an integer id'}), 400
+    
+    owned = owned_campaign_ids(user_id, requested)
+    kol_ids = existing_kol_ids(items)
+    now = datetime.utcnow()
+    results = []
+    rows = []
+    
+    for index, item in enumerate(items):
+        campaign_id = item['id']
+        
+        if campaign_id not in owned:
+            results.append({'index': index, 'id': campaign_id, 'status': 'error', 'error': 'Campaign not found'})
+            continue
+        
+        try:
+            values = campaign_values(item, kol_ids)
+        except (TypeError, ValueError) as e:
+            results.append({'index': index, 'id': campaign_id, 'status': 'error', 'error': str(e)})
+            continue
+        
+        # Same semantics as update_campaign: empty dates leave the stored value alone
+        for field in ('start_date', 'end_date'):
+            if field in values and not values[field]:
+                del values[field]
+        
+        values.update(id=campaign_id, updated_at=now)
+        rows.append(values)
+        results.append({'index': index, 'id': campaign_id, 'status': 'updated'})
+    
+    if rows:
+        # Bulk UPDATE by primary key, batched by the set of changed columns
+        db.session.execute(update(Campaign), rows)
+        record_changes('update', Campaign.for_user(user_id).filter(
+            Campaign.id.in_([row['id'] for row in rows])
+        ).populate_existing().all())
+        db.session.commit()
+    
+    return jsonify({'results': results}), 200
+
+
+@api.route('/api/campaigns/batch', methods=['DELETE'])
+@jwt_required()
+def delete_campaigns_batch():
+    """Delete many campaigns in one statement"""
+    user_id = int(get_jwt_identity())
+    campaign_ids, error = campaign_batch(request.get_json(), 'ids')
+    if error:
+        return error
+    
+    if not all(isinstance(campaign_id, int) for campaign_id in campaign_ids):
+        return jsonify({'error': 'ids must be integers'}), 400
+    
+    owned = owned_campaign_ids(user_id, campaign_ids)
+    
+    if owned:
+        db.session.execute(
+            delete(Campaign).where(Campaign.user_id == user_id, Campaign.id.in_(owned)),
+            execution_options={'synchronize_session': False}
+        )
+        record_deletes(Campaign, owned)
+        db.session.commit()
+    
+    results = [
+        {'index': index, 'id': campaign_id, 'status': 'deleted'} if campaign_id in owned
+        else {'index': index, 'id': campaign_id, 'status': 'error', 'error': 'Campaign not found'}
+        for index, campaign_id in enumerate(campaign_ids)
+    ]
+    
+    return jsonify({'results': results}), 200
+
+
 # Statistics endpoint
-@app.route('/api/stats', methods=['GET'])
+@api.route('/api/stats', methods=['GET'])
 @jwt_required()
 def get_stats():
     user_id = int(get_jwt_identity())
     
     total_kols = KOL.query.count()
-    total_campaigns = Campaign.query.filter_by(user_id=user_id).count()
-    active_campaigns = Campaign.query.filter_by(user_id=user_id, status='active').count()
+    
+    # Both campaign counts from one scan of the tenant's index range
+    total_campaigns, active_campaigns = Campaign.for_user(user_id).with_entities(
+        db.func.count(Campaign.id),
+        db.func.count(Campaign.id).filter(Campaign.status == 'active')
+    ).one()
     
     return jsonify({
         'total_kols': total_kols,
@@ -287,39 +735,55 @@ def get_stats():
     }), 200
 
 
+# Change feed endpoints
+@api.route('/api/changes', methods=['GET'])
+@jwt_required()
+def get_changes():
+    """Changes to KOLs, campaigns and invites after the `since` sequence number (admin only)"""
+    user_id = int(get_jwt_identity())
+    user = User.query.get(user_id)
+    
+    if user.role != 'admin':
+        return jsonify({'error': 'Only admins can read the change feed'}), 403
+    
+    since = request.args.get('since', 0, type=int)
+    changes = change_feed.read(
+        since=since,
+        limit=request.args.get('limit', type=int),
+        entity=request.args.get('entity')
+    )
+    
+    return jsonify({
+        'changes': [change.to_dict() for change in changes],
+        'next_since': changes[-1].id if changes else since
+    }), 200
+
+
+@api.route('/api/changes/stream', methods=['GET'])
+@jwt_required()
+def stream_changes():
+    """Server-sent events stream of the change feed (admin only)"""
+    user_id = int(get_jwt_identity())
+    user = User.query.get(user_id)
+    
+    if user.role != 'admin':
+        return jsonify({'error': 'Only admins can read the change feed'}), 403
+    
+    # EventSource clients resume with Last-Event-ID after a reconnect
+    since = request.headers.get('Last-Event-ID', type=int) or request.args.get('since', 0, type=int)
+    
+    return Response(
+        stream_with_context(change_feed.stream(since=since, entity=request.args.get('entity'))),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
 # Helper function to send email
 def send_invite_email(email, token):
     """Send invitation email to influencer"""
     try:
-        registration_link = f"{os.getenv('FRONTEND_URL', 'http://localhost:3000')}/influencer/register?token={token}"
-        
-        msg = Message(
-            subject="You're invited to join our KOL Platform",
-            recipients=[email],
-            html=f"""
-            <html>
-                <body style="font-family: Arial, sans-serif; padding: 20px;">
-                    <h2 style="color: #667eea;">Welcome to KOL Platform!</h2>
-                    <p>You've been invited to join our platform as an influencer.</p>
-                    <p>Click the link below to complete your registration and connect your Instagram account:</p>
-                    <p style="margin: 30px 0;">
-                        <a href="{registration_link}" 
-                           style="background-color: #667eea; color: white; padding: 12px 30px; 
-                                  text-decoration: none; border-radius: 5px; display: inline-block;">
-                            Complete Registration
-                        </a>
-                    </p>
-                    <p style="color: #666; font-size: 12px;">
-                        This link will expire in 7 days. If you didn't expect this invitation, you can safely ignore this email.
-                    </p>
-                    <p style="color: #666; font-size: 12px;">
-                        Link: {registration_link}
-                    </p>
-                </body>
-            </html>
-            """
-        )
-        mail.send(msg)
+        mail.send(invite_message(email, token))
         return True
     except Exception as e:
         print(f"Error sending email: {str(e)}")
@@ -327,7 +791,7 @@ def send_invite_email(email, token):
 
 
 # Influencer Invite endpoints
-@app.route('/api/invites', methods=['POST'])
+@api.route('/api/invites', methods=['POST'])
 @jwt_required()
 def send_influencer_invite():
     """Admin sends invitation to influencer"""
@@ -355,7 +819,7 @@ def send_influencer_invite():
     
     # Create new invite
     token = InfluencerInvite.generate_token()
-    expires_at = datetime.utcnow() + timedelta(days=7)
+    expires_at = datetime.utcnow() + timedelta(days=INVITE_EXPIRES_DAYS)
     
     invite = InfluencerInvite(
         email=email,
@@ -377,7 +841,7 @@ def send_influencer_invite():
     }), 201
 
 
-@app.route('/api/invites/verify/<token>', methods=['GET'])
+@api.route('/api/invites/verify/<token>', methods=['GET'])
 def verify_invite_token():
     """Verify if invite token is valid"""
     invite = InfluencerInvite.query.filter_by(token=token).first()
@@ -399,13 +863,19 @@ def verify_invite_token():
     }), 200
 
 
-@app.route('/api/invites/complete', methods=['POST'])
+@api.route('/api/invites/complete', methods=['POST'])
 def complete_influencer_registration():
-    """Complete influencer registration with consent and Instagram data"""
+    """Complete influencer registration with consent and Instagram data.
+
+    Runs in a single transaction: the invite row is locked, the KOL is
+    upserted on email, and the invite is marked completed. Retries that
+    carry the same idempotency key replay the original result.
+    """
     data = request.get_json()
     token = data.get('token')
     consent_given = data.get('consent_given')
-    instagram_data = data.get('instagram_data')
+    instagram_data = data.get('instagram_data') or {}
+    idempotency_key = request.headers.get('Idempotency-Key') or data.get('idempotency_key')
     
     if not token:
         return jsonify({'error': 'Token is required'}), 400
@@ -413,51 +883,83 @@ def complete_influencer_registration():
     if not consent_given:
         return jsonify({'error': 'Consent is required to proceed'}), 400
     
-    # Verify token
-    invite = InfluencerInvite.query.filter_by(token=token).first()
+    # Lock the invite so concurrent retries are serialized on it
+    invite = InfluencerInvite.query.filter_by(token=token).with_for_update().first()
     
-    if not invite or invite.is_expired() or invite.status != 'pending':
+    if not invite:
         return jsonify({'error': 'Invalid or expired token'}), 400
     
-    # Check if KOL with this email already exists
-    existing_kol = KOL.query.filter_by(email=invite.email).first()
-    
-    if existing_kol:
-        # Update existing KOL with Instagram data
-        kol = existing_kol
-    else:
-        # Create new KOL
-        kol = KOL(
-            name=instagram_data.get('username', 'New Influencer'),
-            email=invite.email,
-            category='general',
-            platform='instagram'
-        )
-        db.session.add(kol)
+    # Replay of a request that already completed this invite
+    if (invite.status == 'completed' and invite.kol_id
+            and idempotency_key and idempotency_key == invite.completion_key):
+        db.session.rollback()
+        kol = KOL.query.get(invite.kol_id)
+        return jsonify({
+            'message': 'Registration completed successfully',
+            'kol': kol.to_dict()
+        }), 200
+    
+    if invite.is_expired() or invite.status != 'pending':
+        db.session.rollback()
+        return jsonify({'error': 'Invalid or expired token'}), 400
     
-    # Update KOL with Instagram data and consent
+    now = datetime.utcnow()
+    
+    # Fields written on both insert and update
+    values = {
+        'consent_given': True,
+        'consent_given_at': now,
+        'registration_completed': True,
+        'updated_at': now
+    }
+    
+    # Update KOL with Instagram data
     if instagram_data:
-        kol.instagram_id = instagram_data.get('id')
-        kol.instagram_username = instagram_data.get('username')
-        kol.instagram_access_token = instagram_data.get('access_token')
-        kol.followers = instagram_data.get('followers_count', 0)
-        kol.profile_image = instagram_data.get('profile_picture_url')
-        kol.bio = instagram_data.get('biography')
+        values.update({
+            'instagram_id': instagram_data.get('id'),
+            'instagram_username': instagram_data.get('username'),
+            'instagram_access_token': instagram_data.get('access_token'),
+            'followers': instagram_data.get('followers_count', 0),
+            'profile_image': instagram_data.get('profile_picture_url'),
+            'bio': instagram_data.get('biography')
+        })
         
         # Set token expiration (Instagram tokens typically last 60 days)
         if instagram_data.get('access_token'):
-            kol.instagram_token_expires_at = datetime.utcnow() + timedelta(days=60)
+            values['instagram_token_expires_at'] = now + timedelta(days=60)
+    
+    # Create the KOL, or update the existing one with this email
+    stmt = pg_insert(KOL).values(
+        name=instagram_data.get('username') or KOL.PLACEHOLDER_NAME,
+        email=invite.email,
+        category='general',
+        platform='instagram',
+        created_at=now,
+        **values
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[KOL.email],
+        set_={column: stmt.excluded[column] for column in values}
+    ).returning(KOL.id)
     
-    kol.consent_given = True
-    kol.consent_given_at = datetime.utcnow()
-    kol.registration_completed = True
+    try:
+        kol_id = db.session.execute(stmt).scalar_one()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'error': 'Instagram account is already linked to another KOL'}), 409
     
     # Update invite status
     invite.status = 'completed'
-    invite.used_at = datetime.utcnow()
-    invite.kol_id = kol.id
+    invite.used_at = now
+    invite.kol_id = kol_id
+    invite.completion_key = idempotency_key
+    
+    # The upsert bypasses the ORM, so record its change event explicitly
+    kol = db.session.get(KOL, kol_id, populate_existing=True)
+    record_changes('upsert', [kol])
     
     db.session.commit()
+    kol_changed(kol_id)
     
     return jsonify({
         'message': 'Registration completed successfully',
@@ -466,11 +968,11 @@ def complete_influencer_registration():
 
 
 # Instagram API endpoints
-@app.route('/api/instagram/auth-url', methods=['GET'])
+@api.route('/api/instagram/auth-url', methods=['GET'])
 def get_instagram_auth_url():
     """Generate Instagram OAuth URL"""
-    app_id = app.config.get('INSTAGRAM_APP_ID')
-    redirect_uri = app.config.get('INSTAGRAM_REDIRECT_URI')
+    app_id = current_app.config.get('INSTAGRAM_APP_ID')
+    redirect_uri = current_app.config.get('INSTAGRAM_REDIRECT_URI')
     
     if not app_id:
         return jsonify({'error': 'Instagram App ID not configured'}), 500
@@ -486,7 +988,7 @@ def get_instagram_auth_url():
     return jsonify({'auth_url': auth_url}), 200
 
 
-@app.route('/api/instagram/exchange-token', methods=['POST'])
+@api.route('/api/instagram/exchange-token', methods=['POST'])
 def exchange_instagram_token():
     """Exchange Instagram authorization code for access token"""
     data = request.get_json()
@@ -495,9 +997,9 @@ def exchange_instagram_token():
     if not code:
         return jsonify({'error': 'Authorization code is required'}), 400
     
-    app_id = app.config.get('INSTAGRAM_APP_ID')
-    app_secret = app.config.get('INSTAGRAM_APP_SECRET')
-    redirect_uri = app.config.get('INSTAGRAM_REDIRECT_URI')
+    app_id = current_app.config.get('INSTAGRAM_APP_ID')
+    app_secret = current_app.config.get('INSTAGRAM_APP_SECRET')
+    redirect_uri = current_app.config.get('INSTAGRAM_REDIRECT_URI')
     
     if not app_id or not app_secret:
         return jsonify({'error': 'Instagram credentials not configured'}), 500
@@ -556,7 +1058,7 @@ def exchange_instagram_token():
         return jsonify({'error': 'Failed to connect Instagram', 'details': str(e)}), 500
 
 
-@app.route('/api/invites', methods=['GET'])
+@api.route('/api/invites', methods=['GET'])
 @jwt_required()
 def get_invites():
     """Get all invites (admin only)"""
@@ -570,6 +1072,9 @@ def get_invites():
     return jsonify([invite.to_dict() for invite in invites]), 200
 
 
+app = create_app()
+
+
 if __name__ == '__main__':
     app.run(debug=True, port=5001)
 
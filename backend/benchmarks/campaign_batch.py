@@ -0,0 +1,138 @@
+"""
+Batch campaign endpoints against the equivalent single-campaign calls.
+
+Run from backend/ against a seeded database (see "Seeding Large Datasets"
+in the README):
+
+    flask --app app seed --reset --seed 42
+    python benchmarks/campaign_batch.py --sizes 10,100,1000
+
+For each N the script creates, updates and deletes N campaigns for a
+seeded client, once with N calls to the single endpoints and once with one
+call to each batch endpoint, and prints the median wall time and the
+statement count of every phase. Requests go through the Flask test
+client, so HTTP and network round trips are not included; over a real
+network the gap is larger. Every campaign the script creates is deleted
+again.
+"""
+
+import os
+import statistics
+import sys
+import time
+
+import click
+from flask_jwt_extended import create_access_token
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app  # noqa: E402
+from models import db, User, KOL  # noqa: E402
+from query_guard import capture  # noqa: E402
+
+PHASES = ('create', 'update', 'delete')
+
+
+def _expect(response, status):
+    if response.status_code != status:
+        raise click.ClickException(f'{response.request.method} {response.request.path} '
+                                   f'returned {response.status_code}: {response.get_data(as_text=True)}')
+    return response.get_json()
+
+
+def _items(n, kol_ids):
+    return [{
+        'title': f'Benchmark campaign {i}',
+        'description': 'Created by benchmarks/campaign_batch.py',
+        'budget': 1000 + i,
+        'status': 'draft',
+        'kol_id': kol_ids[i % len(kol_ids)] if kol_ids else None
+    } for i in range(n)]
+
+
+def _single(client, headers, items):
+    """Run each phase with one request per campaign; yields (phase, callable)."""
+    ids = []
+
+    def create():
+        for item in items:
+            ids.append(_expect(client.post('/api/campaigns', json=item, headers=headers), 201)['id'])
+
+    def update():
+        for campaign_id in ids:
+            _expect(client.put(f'/api/campaigns/{campaign_id}', json={'status': 'active'}, headers=headers), 200)
+
+    def delete():
+        for campaign_id in ids:
+            _expect(client.delete(f'/api/campaigns/{campaign_id}', headers=headers), 200)
+
+    return (('create', create), ('update', update), ('delete', delete))
+
+
+def _batch(client, headers, items):
+    """Run each phase with one batch request."""
+    ids = []
+
+    def create():
+        results = _expect(client.post('/api/campaigns/batch', json={'campaigns': items}, headers=headers), 201)
+        ids.extend(result['id'] for result in results['results'])
+
+    def update():
+        _expect(client.put('/api/campaigns/batch', json={
+            'campaigns': [{'id': campaign_id, 'status': 'active'} for campaign_id in ids]
+        }, headers=headers), 200)
+
+    def delete():
+        _expect(client.delete('/api/campaigns/batch', json={'ids': ids}, headers=headers), 200)
+
+    return (('create', create), ('update', update), ('delete', delete))
+
+
+def _measure(phases):
+    """Return {phase: (ms, statements)} for one run."""
+    timings = {}
+    for phase, run in phases:
+        with capture() as statements:
+            start = time.perf_counter()
+            run()
+            ms = (time.perf_counter() - start) * 1000
+        timings[phase] = (ms, len(statements))
+    return timings
+
+
+@click.command()
+@click.option('--sizes', default='10,100,1000', show_default=True, help='Comma-separated batch sizes N.')
+@click.option('--repeat', default=3, show_default=True, help='Runs per size; the median is reported.')
+def main(sizes, repeat):
+    """Compare the batch campaign endpoints with N single calls."""
+    sizes = [int(size) for size in sizes.split(',')]
+    if max(sizes) > app.config['CAMPAIGN_BATCH_MAX']:
+        raise click.ClickException(f"Sizes above CAMPAIGN_BATCH_MAX ({app.config['CAMPAIGN_BATCH_MAX']})")
+
+    with app.app_context():
+        user = User.query.filter_by(role='client').order_by(User.id).first()
+        if user is None:
+            raise click.ClickException('No client user; seed the database first')
+        kol_ids = [kol_id for (kol_id,) in db.session.query(KOL.id).order_by(KOL.id).limit(100)]
+        headers = {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+        db.session.remove()
+
+        client = app.test_client()
+        click.echo(f"{app.config['SQLALCHEMY_DATABASE_URI'].split('://')[0]}, user {user.id}, "
+                   f"median of {repeat} runs")
+        click.echo(f"{'N':>6}  {'phase':<7} {'single ms':>10} {'stmts':>6} {'batch ms':>9} {'stmts':>6} {'speedup':>8}")
+
+        for n in sizes:
+            items = _items(n, kol_ids)
+            single = [_measure(_single(client, headers, items)) for _ in range(repeat)]
+            batch = [_measure(_batch(client, headers, items)) for _ in range(repeat)]
+
+            for phase in PHASES:
+                single_ms = statistics.median(run[phase][0] for run in single)
+                batch_ms = statistics.median(run[phase][0] for run in batch)
+                click.echo(f"{n:>6}  {phase:<7} {single_ms:>10.1f} {single[0][phase][1]:>6} "
+                           f"{batch_ms:>9.1f} {batch[0][phase][1]:>6} {single_ms / batch_ms:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
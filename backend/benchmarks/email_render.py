@@ -0,0 +1,96 @@
+"""
+Invite email rendering and batch sending throughput and memory.
+
+Run from backend/; no database or SMTP server is needed:
+
+    python benchmarks/email_render.py --recipients 100000
+
+Synthetic recipients are streamed from a generator through three phases:
+
+    jinja       a full Jinja render of both bodies per recipient, for reference
+    render      get_template('invite').render, the pre-rendered path
+    send_batch  send_batch with MAIL_SUPPRESS_SEND=True, so every Message is
+                built and passed through the SMTP connection pool but nothing
+                leaves the process (MIME encoding is skipped as well)
+
+Each phase runs twice: once timed, for messages per second, and once under
+tracemalloc, for the peak memory allocated while it ran. Memory should not
+grow with --recipients.
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+import click
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from config import Config  # noqa: E402
+from mailer import _env, INVITE_EXPIRES_DAYS, get_template, registration_link, send_batch  # noqa: E402
+
+
+class BenchmarkConfig(Config):
+    MAIL_SUPPRESS_SEND = True
+
+
+def _recipients(n):
+    for i in range(n):
+        yield f'influencer{i}@example.com', {'registration_link': registration_link(f'token-{i:08d}')}
+
+
+def _jinja(n, connections):
+    html, text = _env.get_template('invite.html'), _env.get_template('invite.txt')
+    for _, values in _recipients(n):
+        text.render(expires_days=INVITE_EXPIRES_DAYS, **values)
+        html.render(expires_days=INVITE_EXPIRES_DAYS, **values)
+    return n
+
+
+def _render(n, connections):
+    template = get_template('invite')
+    for _, values in _recipients(n):
+        template.render(**values)
+    return n
+
+
+def _send_batch(n, connections):
+    result = send_batch(get_template('invite'), _recipients(n), connections=connections)
+    if result.sent != n:
+        raise click.ClickException(f'send_batch sent {result.sent} of {n} ({result.failed} failed)')
+    return result.sent
+
+
+PHASES = (('jinja', _jinja), ('render', _render), ('send_batch', _send_batch))
+
+
+@click.command()
+@click.option('--recipients', default=100000, show_default=True, help='Synthetic recipients per phase.')
+@click.option('--connections', default=4, show_default=True, help='send_batch connection pool size.')
+def main(recipients, connections):
+    """Measure invite rendering and suppressed batch sending."""
+    app = create_app(BenchmarkConfig)
+    with app.app_context():
+        get_template('invite')  # compile outside the measurements
+        click.echo(f"{recipients} recipients, {connections} connections")
+        click.echo(f"{'phase':<11} {'seconds':>8} {'messages/s':>11} {'peak KiB':>9}")
+
+        for name, run in PHASES:
+            start = time.perf_counter()
+            count = run(recipients, connections)
+            elapsed = time.perf_counter() - start
+
+            tracemalloc.start()
+            try:
+                run(recipients, connections)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+            click.echo(f"{name:<11} {elapsed:>8.2f} {count / elapsed:>11.0f} {peak / 1024:>9.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Cold start: import of the app to its first response.
+
+Run from backend/ against a migrated database:
+
+    flask --app app db upgrade
+    python benchmarks/startup.py --runs 10
+
+Every run starts a fresh interpreter that imports `app` and requests one
+path through the test client, as a new gunicorn worker or CLI command
+would. The script prints the median time of the import, of the first
+response (which opens the first database connection) and of the whole
+process including interpreter start-up. For a breakdown of the import,
+run `python -X importtime -c 'import app'`.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import click
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = '''
+import json, sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+response = app.app.test_client().get(sys.argv[1])
+responded = time.perf_counter()
+print(json.dumps({'import': imported - started, 'response': responded - imported,
+                  'status': response.status_code}))
+'''
+
+
+def _run(path):
+    started = time.perf_counter()
+    completed = subprocess.run([sys.executable, '-c', CHILD, path], cwd=BACKEND,
+                               capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if completed.returncode != 0:
+        raise click.ClickException(f'Startup failed:\n{completed.stderr}')
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result['process'] = elapsed
+    return result
+
+
+@click.command()
+@click.option('--runs', default=10, show_default=True, help='Fresh processes to start; the median is reported.')
+@click.option('--path', default='/api/kols?limit=20', show_default=True, help='Path of the first request.')
+def main(runs, path):
+    """Time importing the app and serving its first response."""
+    _run(path)  # warm the OS file cache and write .pyc files
+    results = [_run(path) for _ in range(runs)]
+    statuses = {result['status'] for result in results}
+    if any(status >= 400 for status in statuses):
+        raise click.ClickException(f'{path} returned {", ".join(map(str, sorted(statuses)))}')
+
+    click.echo(f"{path}, median of {runs} fresh processes")
+    for key in ('import', 'response', 'process'):
+        ms = [result[key] * 1000 for result in results]
+        click.echo(f"{key:<9} {statistics.median(ms):>8.1f}ms  (min {min(ms):.1f}, max {max(ms):.1f})")
+
+
+if __name__ == '__main__':
+    main()
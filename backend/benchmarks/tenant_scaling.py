@@ -0,0 +1,155 @@
+"""
+Per-tenant campaign latency at two total table sizes.
+
+Seed the same number of tenants with two campaign volumes, profile each
+database, then compare. Tenants are picked by campaign count (the one
+closest to each --sizes target), so both runs time tenants of about the
+same size and only the total table size differs:
+
+    export DATABASE_URL=postgresql://localhost/kol_small
+    flask --app app seed --reset --seed 42 --users 10000 --campaigns 1000000
+    python benchmarks/tenant_scaling.py --output small.json
+
+    export DATABASE_URL=postgresql://localhost/kol_large
+    flask --app app seed --reset --seed 42 --users 10000 --campaigns 10000000
+    python benchmarks/tenant_scaling.py --output large.json
+
+    python benchmarks/tenant_scaling.py --compare small.json large.json
+
+Each run requests GET /api/campaigns and GET /api/stats as every picked
+tenant through the Flask test client and records the median time, the
+statement count and the plan of every statement on `campaigns`. Run
+VACUUM ANALYZE after seeding so both databases have planner statistics.
+"""
+
+import json
+import os
+import statistics
+import sys
+import time
+
+import click
+from flask_jwt_extended import create_access_token
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app  # noqa: E402
+from models import db, Campaign, User  # noqa: E402
+from query_guard import capture, explain  # noqa: E402
+
+ENDPOINTS = (('campaigns.list', '/api/campaigns'), ('stats', '/api/stats'))
+
+
+def _node_types(plan):
+    """Node types of a PostgreSQL JSON plan, or the SQLite plan lines."""
+    if not plan or not isinstance(plan[0], dict):
+        return list(plan)
+
+    def walk(node):
+        name = node['Node Type']
+        if node.get('Index Name'):
+            name += f" using {node['Index Name']}"
+        elif node.get('Relation Name'):
+            name += f" on {node['Relation Name']}"
+        yield name
+        for child in node.get('Plans', []):
+            yield from walk(child)
+
+    return list(walk(plan[0]['Plan']))
+
+
+def _pick_tenants(targets):
+    """Return [(target, user_id, campaign_count)], the tenant closest to each target."""
+    counts = db.session.query(Campaign.user_id, db.func.count()).group_by(Campaign.user_id).all()
+    if not counts:
+        raise click.ClickException('No campaigns; seed the database first')
+    return [
+        (target, *min(counts, key=lambda row: (abs(row[1] - target), row[0])))
+        for target in targets
+    ]
+
+
+def _profile(client, path, headers, repeat):
+    timings = []
+    for _ in range(repeat):
+        with capture() as statements:
+            start = time.perf_counter()
+            response = client.get(path, headers=headers)
+            timings.append((time.perf_counter() - start) * 1000)
+        if response.status_code != 200:
+            raise click.ClickException(f'{path} returned {response.status_code}')
+
+    # Plans of the last run's statements that read campaigns
+    plans = []
+    for item in statements:
+        if ' campaigns' in item['statement'] and not item['executemany']:
+            plans.append(_node_types(explain(item['statement'], item['parameters'])['plan']))
+    return {'ms': round(statistics.median(timings), 2), 'statements': len(statements), 'plans': plans}
+
+
+def _run(sizes, repeat, output):
+    with app.app_context():
+        total = db.session.query(db.func.count(Campaign.id)).scalar()
+        tenants = db.session.query(db.func.count(User.id)).filter(User.role == 'client').scalar()
+        picked = _pick_tenants(sizes)
+        tokens = {user_id: create_access_token(identity=str(user_id)) for _, user_id, _ in picked}
+        db.session.remove()
+
+        dialect = db.engine.dialect.name
+        click.echo(f"{dialect}: {total} campaigns, {tenants} client tenants, median of {repeat}")
+        client = app.test_client()
+        results = []
+        for target, user_id, count in picked:
+            headers = {'Authorization': f'Bearer {tokens[user_id]}'}
+            for name, path in ENDPOINTS:
+                # Warm the tenant's pages once so every run reads from cache
+                client.get(path, headers=headers)
+                result = _profile(client, path, headers, repeat)
+                result.update(target=target, user_id=user_id, campaigns=count, endpoint=name)
+                results.append(result)
+                click.echo(f"  {name:<15} tenant {user_id:>6} ({count:>6} campaigns): "
+                           f"{result['ms']:>8.1f}ms  {result['statements']} statements  "
+                           f"{' | '.join(', '.join(plan) for plan in result['plans'])}")
+
+    report = {'dialect': dialect, 'campaigns': total, 'tenants': tenants, 'results': results}
+    if output:
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+        click.echo(f"Report written to {output}")
+
+
+def _compare(small_path, large_path):
+    with open(small_path) as f:
+        small = json.load(f)
+    with open(large_path) as f:
+        large = json.load(f)
+
+    click.echo(f"{'':<15} {'tenant size':>17}  {small['campaigns']:>10} rows  {large['campaigns']:>10} rows  "
+               f"{'ratio':>6}  plan")
+    rows = {(result['target'], result['endpoint']): result for result in small['results']}
+    for result in large['results']:
+        before = rows.get((result['target'], result['endpoint']))
+        if before is None:
+            continue
+        same = 'same' if before['plans'] == result['plans'] else 'CHANGED'
+        click.echo(f"{result['endpoint']:<15} {before['campaigns']:>7} / {result['campaigns']:>7}  "
+                   f"{before['ms']:>13.1f}ms  {result['ms']:>13.1f}ms  {result['ms'] / before['ms']:>5.2f}x  {same}")
+
+
+@click.command()
+@click.option('--sizes', default='1000,3000,8000', show_default=True,
+              help='Comma-separated tenant sizes (campaigns per tenant) to time.')
+@click.option('--repeat', default=5, show_default=True, help='Requests per tenant; the median is reported.')
+@click.option('--output', type=click.Path(dir_okay=False), help='Write the report as JSON.')
+@click.option('--compare', nargs=2, type=click.Path(exists=True, dir_okay=False),
+              help='Compare two reports (smaller table first) instead of running.')
+def main(sizes, repeat, output, compare):
+    """Time per-tenant campaign endpoints against the configured database."""
+    if compare:
+        _compare(*compare)
+    else:
+        _run([int(size) for size in sizes.split(',')], repeat, output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+"""
+Change-data feed for KOL, Campaign and InfluencerInvite.
+
+Every mutation of a tracked model writes a row to `change_events` in the
+same transaction (a transactional outbox). ORM changes are captured by an
+`after_flush` listener; bulk statements that bypass the unit of work call
+`record_changes` explicitly.
+
+Consumers read the feed in sequence order with a `since` cursor, either
+in batches or as a server-sent-events stream. An event must never appear
+below a cursor a consumer has already moved past, so sequence numbers
+follow commit visibility. On PostgreSQL an event's id is the writing
+transaction's id shifted left by EVENT_BITS plus a counter within the
+transaction; reads stop below the oldest transaction still in progress,
+and every transaction that commits later has a larger id. SQLite runs one
+write transaction at a time, so its autoincrement ids already follow
+commit order.
+"""
+
+from datetime import date, datetime, timedelta
+import json
+import time
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import event, inspect, insert, text
+
+from models import db, KOL, Campaign, InfluencerInvite, ChangeEvent
+
+TRACKED = {
+    KOL: 'kol',
+    Campaign: 'campaign',
+    InfluencerInvite: 'invite'
+}
+
+# Credentials never leave the database through the feed
+EXCLUDED_COLUMNS = {
+    KOL: {'instagram_access_token'},
+    InfluencerInvite: {'token', 'completion_key'}
+}
+
+# Low bits of a PostgreSQL event id: events per transaction
+EVENT_BITS = 20
+
+
+def _json_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def serialize(obj):
+    """Column values of a tracked instance, without relationships or secrets."""
+    model = type(obj)
+    excluded = EXCLUDED_COLUMNS.get(model, set())
+    return {
+        attr.key: _json_value(getattr(obj, attr.key))
+        for attr in inspect(model).column_attrs
+        if attr.key not in excluded
+    }
+
+
+def _event_row(obj, op):
+    # created_at is left to the server default
+    return {
+        'entity': TRACKED[type(obj)],
+        'entity_id': obj.id,
+        'op': op,
+        'payload': {'id': obj.id} if op == 'delete' else serialize(obj)
+    }
+
+
+def _insert(connection, rows):
+    """Insert event rows in the connection's transaction, numbering them on PostgreSQL."""
+    if connection.dialect.name == 'postgresql':
+        xact = connection.scalar(text('SELECT pg_current_xact_id()::text::bigint'))
+        # connection.info lives as long as the pooled connection; the
+        # counter restarts with each new transaction id
+        info = connection.info
+        first = info['change_feed_next'] if info.get('change_feed_xact') == xact else 0
+        if first + len(rows) > 1 << EVENT_BITS:
+            raise RuntimeError(f'More than {1 << EVENT_BITS} change events in one transaction')
+        rows = [dict(row, id=(xact << EVENT_BITS) + first + i) for i, row in enumerate(rows)]
+        info['change_feed_xact'], info['change_feed_next'] = xact, first + len(rows)
+    connection.execute(insert(ChangeEvent), rows)
+
+
+def record_changes(op, objects):
+    """Add change events for instances written by bulk statements.
+
+    Runs in the caller's transaction, so the events commit or roll back
+    together with the change itself.
+    """
+    rows = [_event_row(obj, op) for obj in objects]
+    if rows:
+        _insert(db.session.connection(), rows)
+
+
+def record_deletes(model, ids):
+    """Add delete events for rows removed by a bulk DELETE."""
+    rows = [
+        {'entity': TRACKED[model], 'entity_id': entity_id, 'op': 'delete', 'payload': {'id': entity_id}}
+        for entity_id in ids
+    ]
+    if rows:
+        _insert(db.session.connection(), rows)
+
+
+def _after_flush(session, flush_context):
+    rows = []
+    for obj in session.new:
+        if type(obj) in TRACKED:
+            rows.append(_event_row(obj, 'insert'))
+    for obj in session.dirty:
+        if type(obj) in TRACKED and session.is_modified(obj, include_collections=False):
+            rows.append(_event_row(obj, 'update'))
+    for obj in session.deleted:
+        if type(obj) in TRACKED:
+            rows.append(_event_row(obj, 'delete'))
+    if rows:
+        _insert(session.connection(), rows)
+
+
+class ChangeFeed:
+    """Flask extension that records and reads the change feed."""
+
+    def __init__(self, app=None):
+        self._listening = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('CHANGE_FEED_BATCH_MAX', 1000)
+        app.config.setdefault('CHANGE_FEED_POLL_INTERVAL', 1.0)
+        app.config.setdefault('CHANGE_FEED_STREAM_SECONDS', 60)
+        app.extensions['change_feed'] = self
+        app.cli.add_command(prune_changes_command)
+        if not self._listening:
+            event.listen(db.session, 'after_flush', _after_flush)
+            self._listening = True
+
+    def horizon(self):
+        """Sequence number below which no event can still appear, or None.
+
+        On PostgreSQL every transaction older than the snapshot's xmin has
+        finished, and any transaction yet to commit has a larger id, so no
+        event below `xmin << EVENT_BITS` can still appear. None means every
+        committed event is final (SQLite).
+        """
+        if db.session.get_bind().dialect.name != 'postgresql':
+            return None
+        xmin = db.session.scalar(text('SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint'))
+        return xmin << EVENT_BITS
+
+    def read(self, since=0, limit=None, entity=None):
+        """Return events with a sequence number above `since`, oldest first.
+
+        Events at or above `horizon()` are held back until the transactions
+        in progress before them have finished, so a consumer never moves
+        its cursor past an event that commits later.
+        """
+        config = current_app.config
+        limit = min(max(limit or config['CHANGE_FEED_BATCH_MAX'], 1), config['CHANGE_FEED_BATCH_MAX'])
+
+        query = ChangeEvent.query.filter(ChangeEvent.id > since)
+        horizon = self.horizon()
+        if horizon is not None:
+            query = query.filter(ChangeEvent.id < horizon)
+        if entity:
+            query = query.filter(ChangeEvent.entity == entity)
+        return query.order_by(ChangeEvent.id).limit(limit).all()
+
+    def stream(self, since=0, entity=None):
+        """Yield server-sent events until CHANGE_FEED_STREAM_SECONDS elapse.
+
+        Clients reconnect with the Last-Event-ID header to resume.
+        """
+        config = current_app.config
+        deadline = time.monotonic() + config['CHANGE_FEED_STREAM_SECONDS']
+        yield 'retry: 1000\n\n'
+
+        while time.monotonic() < deadline:
+            events = self.read(since=since, entity=entity)
+            # End the read transaction so the next poll sees new commits
+            db.session.rollback()
+
+            for change in events:
+                since = change.id
+                yield f"id: {change.id}\nevent: change\ndata: {json.dumps(change.to_dict())}\n\n"
+
+            if not events:
+                yield ': keep-alive\n\n'
+                time.sleep(config['CHANGE_FEED_POLL_INTERVAL'])
+
+
+@click.command('prune-changes')
+@click.option('--days', default=30, show_default=True, help='Keep events newer than this many days.')
+@with_appcontext
+def prune_changes_command(days):
+    """Delete change events older than --days."""
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    deleted = ChangeEvent.query.filter(ChangeEvent.created_at < cutoff).delete(synchronize_session=False)
+    db.session.commit()
+    click.echo(f"Deleted {deleted} change events")
@@ -9,4 +9,54 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-key-change-in-production'
     JWT_ACCESS_TOKEN_EXPIRES = 3600  # 1 hour
-
+    
+    # Mail configuration
+    MAIL_SERVER = os.environ.get('MAIL_SERVER', 'smtp.gmail.com')
+    MAIL_PORT = int(os.environ.get('MAIL_PORT', 587))
+    MAIL_USE_TLS = os.environ.get('MAIL_USE_TLS', 'True') == 'True'
+    MAIL_USERNAME = os.environ.get('MAIL_USERNAME')
+    MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
+    MAIL_DEFAULT_SENDER = os.environ.get('MAIL_DEFAULT_SENDER', 'noreply@kolplatform.com')
+    
+    # Instagram API configuration
+    INSTAGRAM_APP_ID = os.environ.get('INSTAGRAM_APP_ID')
+    INSTAGRAM_APP_SECRET = os.environ.get('INSTAGRAM_APP_SECRET')
+    INSTAGRAM_REDIRECT_URI = os.environ.get('INSTAGRAM_REDIRECT_URI', 'http://localhost:3000/influencer/instagram-callback')
+    
+    # In-memory KOL snapshot (see kol_snapshot.py)
+    KOL_SNAPSHOT_ENABLED = os.environ.get('KOL_SNAPSHOT_ENABLED', 'False') == 'True'
+    KOL_SNAPSHOT_MAX_BYTES = int(os.environ.get('KOL_SNAPSHOT_MAX_BYTES', 64 * 1024 * 1024))
+    KOL_SNAPSHOT_MAX_AGE = int(os.environ.get('KOL_SNAPSHOT_MAX_AGE', 30))
+    KOL_SNAPSHOT_OVERLAP = int(os.environ.get('KOL_SNAPSHOT_OVERLAP', 5))
+    KOL_SNAPSHOT_CONSISTENCY = os.environ.get('KOL_SNAPSHOT_CONSISTENCY', 'eventual')
+    
+    # Facet count cache (see kol_facets.py)
+    KOL_FACETS_CACHE_SIZE = int(os.environ.get('KOL_FACETS_CACHE_SIZE', 1024))
+    KOL_FACETS_CACHE_TTL = int(os.environ.get('KOL_FACETS_CACHE_TTL', 60))
+    
+    # Maximum number of items accepted by the /api/campaigns/batch endpoints
+    CAMPAIGN_BATCH_MAX = int(os.environ.get('CAMPAIGN_BATCH_MAX', 1000))
+    
+    # Duplicate KOL detection (see kol_dedup.py)
+    DEDUP_ENABLED = os.environ.get('DEDUP_ENABLED', 'True') == 'True'
+    DEDUP_THRESHOLD = float(os.environ.get('DEDUP_THRESHOLD', 0.6))
+    
+    # Change feed (see change_feed.py)
+    CHANGE_FEED_BATCH_MAX = int(os.environ.get('CHANGE_FEED_BATCH_MAX', 1000))
+    CHANGE_FEED_STREAM_SECONDS = int(os.environ.get('CHANGE_FEED_STREAM_SECONDS', 60))
+    
+    # Profile image proxy (see image_cache.py); defaults to instance/image_cache
+    if os.environ.get('IMAGE_CACHE_DIR'):
+        IMAGE_CACHE_DIR = os.environ.get('IMAGE_CACHE_DIR')
+    IMAGE_CACHE_MAX_BYTES = int(os.environ.get('IMAGE_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+    IMAGE_WORKERS = int(os.environ.get('IMAGE_WORKERS', 4))
+    
+    # Semantic KOL search (see kol_search.py); defaults to instance/kol_search
+    if os.environ.get('KOL_SEARCH_DIR'):
+        KOL_SEARCH_DIR = os.environ.get('KOL_SEARCH_DIR')
+    KOL_SEARCH_NPROBE = int(os.environ.get('KOL_SEARCH_NPROBE', 16))
+    KOL_SEARCH_MAX_FILTER_IDS = int(os.environ.get('KOL_SEARCH_MAX_FILTER_IDS', 100000))
+    
+    # Slow-query log (see query_guard.py); JSON lines, stdout when unset
+    SLOW_QUERY_MS = int(os.environ.get('SLOW_QUERY_MS', 250))
+    SLOW_QUERY_LOG = os.environ.get('SLOW_QUERY_LOG') or None
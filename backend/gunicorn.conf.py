@@ -0,0 +1,30 @@
+"""
+Gunicorn configuration.
+
+The app is imported once in the master (preload_app) and shared with the
+workers via fork. Creating the app never opens a database connection, but
+each worker still disposes the inherited engine pools so no connection is
+ever shared across processes.
+
+Workers are threaded (gthread): a /api/changes/stream client holds its
+thread for up to CHANGE_FEED_STREAM_SECONDS, and with sync workers a few
+subscribers would block every other request. Keep GUNICORN_THREADS at or
+below the SQLAlchemy pool size (5 + 10 overflow by default).
+
+Usage:
+    gunicorn -c gunicorn.conf.py app:app
+"""
+
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5001')
+workers = int(os.getenv('GUNICORN_WORKERS', 4))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+preload_app = os.getenv('GUNICORN_PRELOAD', 'True') == 'True'
+
+
+def post_fork(server, worker):
+    from app import app, dispose_engines
+    dispose_engines(app)
@@ -0,0 +1,323 @@
+"""
+Image proxy and thumbnail cache for KOL profile images.
+
+Profile image URLs (Instagram CDN links in particular) expire, so each
+source image is fetched once and kept in a content-addressed on-disk
+cache together with its resized thumbnails. Clients never see the source
+URL: they get a signed token, which also stops the proxy from being used
+to fetch arbitrary URLs. Profile image URLs still come from influencers,
+so the fetcher only speaks http(s), follows redirects itself and refuses
+to connect to loopback, private, link-local or otherwise non-public
+addresses; the check runs on the connected socket, so DNS rebinding and
+redirects cannot get around it.
+
+Cache layout under IMAGE_CACHE_DIR:
+    sources/<sha256 of url>        content hash of the fetched image
+    blobs/<ab>/<hash>.orig         original bytes
+    blobs/<ab>/<hash>-<size>.jpg   thumbnails
+
+Blobs are evicted least-recently-used once IMAGE_CACHE_MAX_BYTES is
+exceeded. Fetching goes through a transport object so it can be replaced,
+e.g. with an in-memory one when running offline.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import hashlib
+import io
+import ipaddress
+import os
+import tempfile
+import threading
+from urllib.parse import urljoin, urlparse
+
+from flask import current_app, has_app_context
+from itsdangerous import BadSignature, URLSafeSerializer
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - Pillow is optional
+    Image = None
+
+# Signed tokens remembered per process; the same KOL images are listed often
+TOKEN_CACHE_SIZE = 10000
+
+
+class ImageFetchError(Exception):
+    pass
+
+
+def _check_public(address):
+    """Raise ImageFetchError unless `address` is a public unicast IP."""
+    ip = ipaddress.ip_address(address.split('%', 1)[0])
+    if ip.version == 6 and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    if not ip.is_global or ip.is_multicast:
+        raise ImageFetchError(f'Refusing to connect to non-public address {ip}')
+
+
+class _PublicHTTPConnection(HTTPConnection):
+    def _new_conn(self):
+        sock = super()._new_conn()
+        try:
+            _check_public(sock.getpeername()[0])
+        except ImageFetchError:
+            sock.close()
+            raise
+        return sock
+
+
+class _PublicHTTPSConnection(HTTPSConnection, _PublicHTTPConnection):
+    pass
+
+
+class _PublicHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _PublicHTTPConnection
+
+
+class _PublicHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _PublicHTTPSConnection
+
+
+class _PublicAdapter(HTTPAdapter):
+    """Transport adapter whose connections only reach public addresses."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _PublicHTTPConnectionPool,
+            'https': _PublicHTTPSConnectionPool
+        }
+
+
+class RequestsTransport:
+    """Fetch images over HTTP with a size, time and redirect limit."""
+
+    def __init__(self, timeout=10, max_bytes=5 * 1024 * 1024, max_redirects=3):
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.max_redirects = max_redirects
+        self._local = threading.local()
+
+    def _session(self):
+        # Sessions are not thread-safe; fetches run on a thread pool
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            # A proxy from the environment would be the only address checked
+            session.trust_env = False
+            session.mount('http://', _PublicAdapter())
+            session.mount('https://', _PublicAdapter())
+            self._local.session = session
+        return session
+
+    def _get(self, url):
+        """GET `url`, following redirects one checked hop at a time."""
+        for _ in range(self.max_redirects + 1):
+            parsed = urlparse(url)
+            if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+                raise ImageFetchError('Only http and https image URLs are supported')
+            try:
+                response = self._session().get(url, timeout=self.timeout, stream=True, allow_redirects=False)
+            except requests.RequestException as e:
+                raise ImageFetchError(str(e))
+            if not response.is_redirect:
+                return response
+            url = urljoin(url, response.headers['Location'])
+            response.close()
+        raise ImageFetchError('Too many redirects')
+
+    def fetch(self, url):
+        response = self._get(url)
+
+        with response:
+            if response.status_code != 200:
+                raise ImageFetchError(f'Upstream returned {response.status_code}')
+            if not response.headers.get('Content-Type', '').startswith('image/'):
+                raise ImageFetchError('Upstream did not return an image')
+
+            body = io.BytesIO()
+            for chunk in response.iter_content(64 * 1024):
+                body.write(chunk)
+                if body.tell() > self.max_bytes:
+                    raise ImageFetchError('Image too large')
+            return body.getvalue()
+
+
+class StaticTransport:
+    """Serve images from a dict of url -> bytes, for offline use."""
+
+    def __init__(self, images):
+        self.images = images
+
+    def fetch(self, url):
+        if url not in self.images:
+            raise ImageFetchError('Image not found')
+        return self.images[url]
+
+
+def image_url(url):
+    """Proxy path for a source image URL, or None when there is nothing to proxy."""
+    if not url or not has_app_context() or 'image_cache' not in current_app.extensions:
+        return None
+    return current_app.extensions['image_cache'].url_for(url)
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _resize(data, size):
+    image = Image.open(io.BytesIO(data))
+    image = image.convert('RGB')
+    image.thumbnail((size, size))
+    out = io.BytesIO()
+    image.save(out, format='JPEG', quality=85, optimize=True)
+    return out.getvalue()
+
+
+class ImageCache:
+    """Flask extension serving cached profile image thumbnails."""
+
+    def __init__(self, app=None, transport=None):
+        self.transport = transport
+        self._executor = None
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._size = None
+        self._serializer = None
+        self._tokens = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app, transport=None):
+        app.config.setdefault('IMAGE_CACHE_DIR', os.path.join(app.instance_path, 'image_cache'))
+        app.config.setdefault('IMAGE_CACHE_MAX_BYTES', 512 * 1024 * 1024)
+        app.config.setdefault('IMAGE_THUMBNAIL_SIZES', (64, 128, 256, 512))
+        app.config.setdefault('IMAGE_WORKERS', 4)
+        if transport is not None:
+            self.transport = transport
+        if self.transport is None:
+            self.transport = RequestsTransport()
+        # Built once: every serialized KOL signs its image URL, and the
+        # tokens are deterministic, so repeated URLs are not signed again
+        self._serializer = URLSafeSerializer(app.config['SECRET_KEY'], salt='profile-image')
+        self._tokens = lru_cache(maxsize=TOKEN_CACHE_SIZE)(self._serializer.dumps)
+        app.extensions['image_cache'] = self
+
+    def available(self):
+        return Image is not None
+
+    def token(self, url):
+        return self._tokens(url)
+
+    def url_for(self, url):
+        return f'/api/images/{self.token(url)}'
+
+    def source_url(self, token):
+        try:
+            return self._serializer.loads(token)
+        except BadSignature:
+            return None
+
+    def thumbnail(self, url, size):
+        """Return (path, etag) of the thumbnail, fetching and resizing on a miss."""
+        config = current_app.config
+        key = (url, size)
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=config['IMAGE_WORKERS'])
+            # Concurrent requests for the same thumbnail share one job
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._executor.submit(self._thumbnail, config['IMAGE_CACHE_DIR'],
+                                               config['IMAGE_CACHE_MAX_BYTES'], url, size)
+                self._inflight[key] = future
+                future.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        return future.result()
+
+    def _thumbnail(self, root, max_bytes, url, size):
+        source_path = os.path.join(root, 'sources', _sha256(url.encode()))
+        content_hash = None
+        if os.path.exists(source_path):
+            with open(source_path) as f:
+                content_hash = f.read().strip()
+
+        if content_hash:
+            thumb_path = os.path.join(root, 'blobs', content_hash[:2], f'{content_hash}-{size}.jpg')
+            if os.path.exists(thumb_path):
+                os.utime(thumb_path)
+                return thumb_path, f'{content_hash}-{size}'
+
+        original = None
+        if content_hash:
+            original_path = os.path.join(root, 'blobs', content_hash[:2], f'{content_hash}.orig')
+            if os.path.exists(original_path):
+                with open(original_path, 'rb') as f:
+                    original = f.read()
+                os.utime(original_path)
+
+        if original is None:
+            # Cold miss, or the original was evicted: fetch it once more
+            original = self.transport.fetch(url)
+            content_hash = _sha256(original)
+            original_path = os.path.join(root, 'blobs', content_hash[:2], f'{content_hash}.orig')
+            _write_atomic(original_path, original)
+            _write_atomic(source_path, content_hash.encode())
+            self._track(root, max_bytes, len(original))
+
+        try:
+            thumbnail = _resize(original, size)
+        except (OSError, ValueError, Image.DecompressionBombError) as e:
+            raise ImageFetchError(f'Unreadable image: {e}')
+
+        thumb_path = os.path.join(root, 'blobs', content_hash[:2], f'{content_hash}-{size}.jpg')
+        _write_atomic(thumb_path, thumbnail)
+        self._track(root, max_bytes, len(thumbnail))
+        return thumb_path, f'{content_hash}-{size}'
+
+    def _blobs(self, root):
+        blobs = os.path.join(root, 'blobs')
+        if not os.path.isdir(blobs):
+            return
+        for shard in os.scandir(blobs):
+            if shard.is_dir():
+                for entry in os.scandir(shard.path):
+                    if entry.is_file():
+                        yield entry
+
+    def _track(self, root, max_bytes, added):
+        """Account for a new blob and evict least recently used ones when over budget."""
+        with self._lock:
+            if self._size is None:
+                self._size = sum(entry.stat().st_size for entry in self._blobs(root))
+            else:
+                self._size += added
+            if self._size <= max_bytes:
+                return
+
+            # Evict down to 90% so eviction is not triggered on every write
+            entries = sorted(self._blobs(root), key=lambda entry: entry.stat().st_mtime)
+            for entry in entries:
+                if self._size <= max_bytes * 0.9:
+                    break
+                try:
+                    size = entry.stat().st_size
+                    os.remove(entry.path)
+                    self._size -= size
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,277 @@
+"""
+Duplicate and lookalike KOL detection.
+
+Every KOL gets a MinHash signature of its bio and a set of blocking keys:
+its normalized name, its normalized Instagram handle and one key per LSH
+band of the signature. Only KOLs that share a key are ever compared, so
+the index scales without pairwise comparison. Keys shared by more than
+DEDUP_MAX_BUCKET KOLs are too common to be evidence and are skipped.
+
+A matching handle is a duplicate. A matching name only counts together
+with overlapping bios, since common names and the registration placeholder
+name are shared by unrelated KOLs.
+
+Signatures live in `kol_signatures` and keys in `kol_dedup_keys`. The
+whole index is rebuilt offline with `flask dedup-index` and kept current
+incrementally as KOLs are written. Incremental updates only merge
+clusters; run the offline rebuild to split clusters that no longer match.
+"""
+
+from collections import defaultdict
+import hashlib
+import re
+import unicodedata
+import zlib
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+import numpy as np
+
+from models import db, KOL, KOLSignature, KOLDedupKey
+
+NUM_PERM = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+SHINGLE_SIZE = 5
+MIN_SHINGLES = 10
+NAME_MIN_JACCARD = 0.4  # bio overlap needed before a shared name raises the score
+
+# Fixed seed so every process derives the same permutations. a * h + b is
+# reduced modulo a prime well below the hash range so it wraps many times;
+# all intermediates stay below 2**63.
+_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(0x6B6F6C)
+_PERM_A = _rng.integers(1, _PRIME, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, _PRIME, size=NUM_PERM, dtype=np.uint64)
+
+
+def normalize(text):
+    """Lowercase, strip accents and drop everything but letters, digits and spaces."""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(c for c in text if not unicodedata.combining(c)).lower()
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', text).split())
+
+
+def normalize_handle(username):
+    return re.sub(r'[^a-z0-9]', '', (username or '').lower())
+
+
+def minhash(bio):
+    """MinHash signature of the bio's character shingles, or None if it is too short."""
+    text = normalize(bio)
+    shingles = {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+    if len(shingles) < MIN_SHINGLES:
+        return None
+
+    hashes = np.fromiter((zlib.crc32(s.encode()) for s in shingles), dtype=np.uint64, count=len(shingles))
+    permuted = (_PERM_A[:, None] * hashes[None, :] + _PERM_B[:, None]) % _PRIME
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+def name_key(name):
+    """Normalized name, or '' for the placeholder name, which identifies no one."""
+    text = normalize(name)
+    return '' if text == normalize(KOL.PLACEHOLDER_NAME) else text
+
+
+def blocking_keys(name, username, signature):
+    keys = set()
+    if name_key(name):
+        keys.add('n:' + name_key(name)[:60])
+    if normalize_handle(username):
+        keys.add('h:' + normalize_handle(username)[:60])
+    if signature is not None:
+        for band in range(BANDS):
+            chunk = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND].tobytes()
+            keys.add(f'b{band}:' + hashlib.blake2b(chunk, digest_size=8).hexdigest())
+    return keys
+
+
+def similarity(a, b):
+    """Score two (name, username, signature) tuples between 0 and 1."""
+    name_a, handle_a, sig_a = a
+    name_b, handle_b, sig_b = b
+
+    if normalize_handle(handle_a) and normalize_handle(handle_a) == normalize_handle(handle_b):
+        return 1.0
+
+    jaccard = 0.0
+    if sig_a is not None and sig_b is not None:
+        jaccard = float(np.mean(sig_a == sig_b))
+
+    if name_key(name_a) and name_key(name_a) == name_key(name_b) and jaccard >= NAME_MIN_JACCARD:
+        return 0.6 + 0.4 * jaccard
+    return jaccard
+
+
+def _signature(value):
+    return None if value is None else np.frombuffer(value, dtype=np.uint32)
+
+
+class KOLDedup:
+    """Flask extension maintaining and querying the dedup index."""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('DEDUP_ENABLED', True)
+        app.config.setdefault('DEDUP_THRESHOLD', 0.6)
+        app.config.setdefault('DEDUP_MAX_BUCKET', 100)
+        app.config.setdefault('DEDUP_MAX_CANDIDATES', 200)
+        app.extensions['kol_dedup'] = self
+        app.cli.add_command(dedup_index_command)
+
+    def enabled(self):
+        return current_app.config['DEDUP_ENABLED']
+
+    def _candidates(self, kol_id, keys):
+        """Load (kol_id, name, username, signature, cluster_id) for KOLs sharing a key.
+
+        Like `rebuild`, keys held by more than DEDUP_MAX_BUCKET KOLs are skipped.
+        """
+        max_bucket = current_app.config['DEDUP_MAX_BUCKET']
+        crowded = {key for key, count in db.session.query(KOLDedupKey.key, db.func.count()).filter(
+            KOLDedupKey.key.in_(keys),
+            KOLDedupKey.kol_id != kol_id
+        ).group_by(KOLDedupKey.key) if count + 1 > max_bucket} if keys else set()
+        keys = set(keys) - crowded
+        if not keys:
+            return []
+        shared = db.session.query(KOLDedupKey.kol_id).filter(
+            KOLDedupKey.key.in_(keys),
+            KOLDedupKey.kol_id != kol_id
+        ).group_by(KOLDedupKey.kol_id).order_by(
+            db.func.count().desc()
+        ).limit(current_app.config['DEDUP_MAX_CANDIDATES']).subquery()
+
+        rows = db.session.query(
+            KOL.id, KOL.name, KOL.instagram_username, KOLSignature.minhash, KOLSignature.cluster_id
+        ).join(KOLSignature, KOLSignature.kol_id == KOL.id).filter(KOL.id.in_(db.select(shared.c.kol_id))).all()
+        return [(row[0], row[1], row[2], _signature(row[3]), row[4]) for row in rows]
+
+    def index_kol(self, kol_id):
+        """Recompute one KOL's signature and keys and merge it into matching clusters."""
+        if not self.enabled():
+            return
+
+        KOLDedupKey.query.filter_by(kol_id=kol_id).delete()
+        kol = db.session.get(KOL, kol_id)
+        if kol is None:
+            KOLSignature.query.filter_by(kol_id=kol_id).delete()
+            db.session.commit()
+            return
+
+        signature = minhash(kol.bio)
+        keys = blocking_keys(kol.name, kol.instagram_username, signature)
+        if keys:
+            db.session.execute(db.insert(KOLDedupKey), [{'key': key, 'kol_id': kol_id} for key in keys])
+
+        threshold = current_app.config['DEDUP_THRESHOLD']
+        own = (kol.name, kol.instagram_username, signature)
+        clusters = {
+            cluster_id for other_id, name, username, other_signature, cluster_id in self._candidates(kol_id, keys)
+            if similarity(own, (name, username, other_signature)) >= threshold
+        }
+        cluster_id = min(clusters | {kol_id})
+
+        record = db.session.get(KOLSignature, kol_id) or KOLSignature(kol_id=kol_id)
+        record.minhash = None if signature is None else signature.tobytes()
+        record.cluster_id = cluster_id
+        db.session.add(record)
+
+        if clusters:
+            KOLSignature.query.filter(KOLSignature.cluster_id.in_(clusters)).update(
+                {'cluster_id': cluster_id}, synchronize_session=False
+            )
+        db.session.commit()
+
+    def similar(self, kol, limit=10):
+        """Return [(kol_id, score)] for the KOLs most similar to `kol`."""
+        signature = minhash(kol.bio)
+        keys = blocking_keys(kol.name, kol.instagram_username, signature)
+        own = (kol.name, kol.instagram_username, signature)
+
+        scored = [
+            (other_id, similarity(own, (name, username, other_signature)))
+            for other_id, name, username, other_signature, _ in self._candidates(kol.id, keys)
+        ]
+        scored = [item for item in scored if item[1] > 0]
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:limit]
+
+    def clusters(self, offset=0, limit=50):
+        """Return pages of duplicate clusters as {cluster_id: [kol_id, ...]}."""
+        cluster_ids = [cluster_id for (cluster_id,) in db.session.query(KOLSignature.cluster_id).group_by(
+            KOLSignature.cluster_id
+        ).having(db.func.count() > 1).order_by(KOLSignature.cluster_id).offset(offset).limit(limit)]
+
+        members = defaultdict(list)
+        for kol_id, cluster_id in db.session.query(KOLSignature.kol_id, KOLSignature.cluster_id).filter(
+            KOLSignature.cluster_id.in_(cluster_ids)
+        ).order_by(KOLSignature.kol_id):
+            members[cluster_id].append(kol_id)
+        return {cluster_id: members[cluster_id] for cluster_id in cluster_ids}
+
+    def rebuild(self, batch_size=5000):
+        """Recompute every signature, key and cluster from scratch."""
+        threshold = current_app.config['DEDUP_THRESHOLD']
+        max_bucket = current_app.config['DEDUP_MAX_BUCKET']
+
+        KOLDedupKey.query.delete()
+        KOLSignature.query.delete()
+
+        ids, records = [], []
+        buckets = defaultdict(list)
+        query = db.session.query(KOL.id, KOL.name, KOL.instagram_username, KOL.bio).order_by(KOL.id)
+        for kol_id, name, username, bio in query.yield_per(batch_size):
+            signature = minhash(bio)
+            position = len(ids)
+            ids.append(kol_id)
+            records.append((name, username, signature))
+            for key in blocking_keys(name, username, signature):
+                buckets[key].append(position)
+
+        # Union-find over pairs that share a bucket and score above the threshold
+        parent = list(range(len(ids)))
+
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        for members in buckets.values():
+            if len(members) < 2 or len(members) > max_bucket:
+                continue
+            for i, a in enumerate(members):
+                for b in members[i + 1:]:
+                    root_a, root_b = find(a), find(b)
+                    if root_a != root_b and similarity(records[a], records[b]) >= threshold:
+                        parent[max(root_a, root_b)] = min(root_a, root_b)
+
+        # Positions follow kol_id order, so each root is the lowest id in its cluster
+        rows = [
+            {'kol_id': kol_id, 'minhash': None if record[2] is None else record[2].tobytes(),
+             'cluster_id': ids[find(position)]}
+            for position, (kol_id, record) in enumerate(zip(ids, records))
+        ]
+        for start in range(0, len(rows), batch_size):
+            db.session.execute(db.insert(KOLSignature), rows[start:start + batch_size])
+
+        keys = [{'key': key, 'kol_id': ids[position]} for key, members in buckets.items() for position in members]
+        for start in range(0, len(keys), batch_size):
+            db.session.execute(db.insert(KOLDedupKey), keys[start:start + batch_size])
+
+        db.session.commit()
+        return len(ids), sum(1 for position in range(len(ids)) if find(position) != position)
+
+
+@click.command('dedup-index')
+@with_appcontext
+def dedup_index_command():
+    """Rebuild the KOL duplicate index from scratch."""
+    total, duplicates = current_app.extensions['kol_dedup'].rebuild()
+    click.echo(f"Indexed {total} KOLs, {duplicates} flagged as duplicates")
@@ -0,0 +1,166 @@
+"""
+Faceted counts for KOL discovery.
+
+For a set of `get_kols` filters, returns how many matching KOLs fall into
+each category, platform, follower bucket and price bucket. Counts come
+from a vectorized pass over the KOL snapshot when it is enabled, otherwise
+from one grouped SQL query using GROUPING SETS.
+
+Results are cached per filter signature and dropped on KOL writes in this
+process; other workers pick up changes after KOL_FACETS_CACHE_TTL seconds.
+"""
+
+from collections import OrderedDict
+import threading
+import time
+
+import numpy as np
+
+from models import db, KOL
+
+# (lower bound, label); each bucket runs up to the next lower bound
+FOLLOWER_BUCKETS = [
+    (0, '<10k'),
+    (10_000, '10k-100k'),
+    (100_000, '100k-1M'),
+    (1_000_000, '1M+')
+]
+PRICE_BUCKETS = [
+    (0, '<500'),
+    (500, '500-1k'),
+    (1_000, '1k-5k'),
+    (5_000, '5k+')
+]
+
+
+def _bucket_case(column, buckets):
+    """SQL CASE mapping `column` to its bucket label; NULL stays NULL."""
+    whens = [(column >= lower, label) for lower, label in reversed(buckets)]
+    return db.case(*whens)
+
+
+def _bucket_counts(values, buckets):
+    counts = dict.fromkeys((label for _, label in buckets), 0)
+    values = values[~np.isnan(values)]
+    edges = np.array([lower for lower, _ in buckets[1:]], dtype=np.float64)
+    # Values below the first lower bound match no bucket, as in SQL
+    values = values[values >= buckets[0][0]]
+    for (_, label), count in zip(buckets, np.bincount(np.digitize(values, edges), minlength=len(buckets))):
+        counts[label] = int(count)
+    return counts
+
+
+class KOLFacets:
+    """Flask extension computing and caching facet counts."""
+
+    def __init__(self, app=None):
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('KOL_FACETS_CACHE_SIZE', 1024)
+        app.config.setdefault('KOL_FACETS_CACHE_TTL', 60)
+        app.extensions['kol_facets'] = self
+
+    def invalidate(self):
+        with self._lock:
+            self._cache.clear()
+
+    def counts(self, config, snapshot, category=None, platform=None,
+               min_followers=None, max_price=None):
+        filters = {
+            'category': category,
+            'platform': platform,
+            'min_followers': min_followers,
+            'max_price': max_price
+        }
+        signature = tuple(sorted(filters.items()))
+
+        with self._lock:
+            cached = self._cache.get(signature)
+            if cached and time.monotonic() - cached[0] < config['KOL_FACETS_CACHE_TTL']:
+                self._cache.move_to_end(signature)
+                return cached[1]
+
+        columns = snapshot.columns(config)
+        if columns is not None:
+            result = self._from_snapshot(snapshot, columns, filters)
+        else:
+            result = self._from_sql(filters)
+
+        with self._lock:
+            self._cache[signature] = (time.monotonic(), result)
+            self._cache.move_to_end(signature)
+            while len(self._cache) > config['KOL_FACETS_CACHE_SIZE']:
+                self._cache.popitem(last=False)
+
+        return result
+
+    def _from_snapshot(self, snapshot, columns, filters):
+        mask = snapshot.filter_mask(columns, **filters)
+
+        def dictionary_counts(codes, dictionary):
+            counts = np.bincount(codes[mask], minlength=len(dictionary))
+            return {value: int(count) for value, count in zip(dictionary, counts) if count}
+
+        return {
+            'total': int(mask.sum()),
+            'category': dictionary_counts(columns.category, columns.categories),
+            'platform': dictionary_counts(columns.platform, columns.platforms),
+            'followers': _bucket_counts(columns.followers[mask], FOLLOWER_BUCKETS),
+            'price_per_post': _bucket_counts(columns.price_per_post[mask], PRICE_BUCKETS)
+        }
+
+    def _from_sql(self, filters):
+        query = db.session.query(
+            KOL.category.label('category'),
+            KOL.platform.label('platform'),
+            _bucket_case(KOL.followers, FOLLOWER_BUCKETS).label('followers'),
+            _bucket_case(KOL.price_per_post, PRICE_BUCKETS).label('price_per_post')
+        )
+
+        if filters['category']:
+            query = query.filter(KOL.category == filters['category'])
+        if filters['platform']:
+            query = query.filter(KOL.platform == filters['platform'])
+        if filters['min_followers']:
+            query = query.filter(KOL.followers >= filters['min_followers'])
+        if filters['max_price']:
+            query = query.filter(KOL.price_per_post <= filters['max_price'])
+
+        # Bucket in a subquery so the grouping sets refer to plain columns
+        matching = query.subquery()
+        dimensions = [matching.c.category, matching.c.platform,
+                      matching.c.followers, matching.c.price_per_post]
+
+        # One grouping set per facet plus the empty set for the total
+        query = db.session.query(
+            *dimensions,
+            *(db.func.grouping(column) for column in dimensions),
+            db.func.count()
+        ).group_by(db.func.grouping_sets(
+            *(db.tuple_(column) for column in dimensions), db.tuple_()
+        ))
+
+        result = {
+            'total': 0,
+            'category': {},
+            'platform': {},
+            'followers': dict.fromkeys((label for _, label in FOLLOWER_BUCKETS), 0),
+            'price_per_post': dict.fromkeys((label for _, label in PRICE_BUCKETS), 0)
+        }
+        names = [column.name for column in dimensions]
+        for row in query.all():
+            values, grouping, count = row[:4], row[4:8], row[8]
+            grouped = [name for name, flag in zip(names, grouping) if flag == 0]
+            if not grouped:
+                result['total'] = count
+                continue
+            name = grouped[0]
+            value = values[names.index(name)]
+            if value is not None:
+                result[name][value] = count
+
+        return result
@@ -0,0 +1,317 @@
+"""
+Semantic KOL search over bio and name embeddings.
+
+Text is embedded with a signed hashing vectorizer over words, word
+bigrams and character 4-grams, so no model download or network access
+is needed. Vectors are L2-normalized float32 and compared by dot product.
+
+The base index is built offline with `flask search-index` into
+KOL_SEARCH_DIR. It holds the vectors as a memory-mapped matrix whose rows
+are grouped by IVF list, the matching KOL ids, the list centroids and the
+row range of every list. A query scores the centroids, then only the rows
+of the closest KOL_SEARCH_NPROBE lists. A search can be restricted to a
+set of KOL ids (the rows matching the `get_kols` filters) before ranking:
+small sets are scored exactly, larger ones by probing more lists until
+enough matches are found.
+
+Each worker keeps a small in-memory delta of KOLs written since the build,
+read from the change feed, so new and edited KOLs are searchable within
+seconds without touching the shared files. Rebuilding folds the delta back
+into the base index.
+"""
+
+from datetime import datetime
+import json
+import os
+import shutil
+import threading
+import time
+import zlib
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+import numpy as np
+
+from kol_dedup import normalize
+from models import db, KOL, ChangeEvent
+
+DIM = 256
+STOPWORDS = frozenset(
+    'a an and are as at be by for from has have i in is it my of on or our the to we with you your'.split()
+)
+
+
+def _features(text):
+    words = [word for word in normalize(text).split() if word not in STOPWORDS]
+    for word in words:
+        yield word, 1.0
+        padded = f'<{word}>'
+        for i in range(len(padded) - 3):
+            yield padded[i:i + 4], 0.25
+    for first, second in zip(words, words[1:]):
+        yield f'{first} {second}', 0.5
+
+
+def embed(text):
+    """Hashing-vectorizer embedding of `text`; the zero vector if it has no terms."""
+    vector = np.zeros(DIM, dtype=np.float32)
+    for feature, weight in _features(text):
+        h = zlib.crc32(feature.encode())
+        vector[h % DIM] += weight if h & 0x80000000 else -weight
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def kol_text(name, bio):
+    return f'{name or ""} {bio or ""}'
+
+
+def _kmeans(sample, nlist, iterations=10, seed=0):
+    """Spherical k-means; returns unit-length centroids."""
+    rng = np.random.default_rng(seed)
+    centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(sample @ centroids.T, axis=1)
+        for c in range(nlist):
+            members = sample[assignment == c]
+            # Reseed empty lists from a random sample row
+            centroid = members.sum(axis=0) if len(members) else sample[rng.integers(len(sample))]
+            norm = np.linalg.norm(centroid)
+            centroids[c] = centroid / norm if norm else centroid
+    return centroids
+
+
+class _Base:
+    """One built index, memory-mapped read-only."""
+
+    def __init__(self, path):
+        with open(os.path.join(path, 'meta.json')) as f:
+            self.meta = json.load(f)
+        count, nlist = self.meta['count'], self.meta['nlist']
+        if self.meta['dim'] != DIM:
+            raise ValueError('Search index was built with a different dimension; rebuild it')
+        self.path = path
+        self.vectors = np.memmap(os.path.join(path, 'vectors.f32'), dtype=np.float32, mode='r', shape=(count, DIM)) \
+            if count else np.zeros((0, DIM), dtype=np.float32)
+        self.ids = np.fromfile(os.path.join(path, 'ids.i64'), dtype=np.int64)
+        self.centroids = np.fromfile(os.path.join(path, 'centroids.f32'), dtype=np.float32).reshape(nlist, DIM)
+        self.offsets = np.fromfile(os.path.join(path, 'offsets.i64'), dtype=np.int64)
+        self._sorter = np.argsort(self.ids, kind='stable')
+        self._sorted_ids = self.ids[self._sorter]
+
+    def positions(self, ids):
+        """Row positions of the `ids` present in this build, in row order."""
+        found = _member(ids, self._sorted_ids)
+        return np.sort(self._sorter[np.searchsorted(self._sorted_ids, ids[found])])
+
+
+def _member(values, sorted_set):
+    """Boolean mask of the `values` that occur in the sorted array `sorted_set`."""
+    if not len(sorted_set):
+        return np.zeros(len(values), dtype=bool)
+    index = np.minimum(np.searchsorted(sorted_set, values), len(sorted_set) - 1)
+    return sorted_set[index] == values
+
+
+class KOLSearch:
+    """Flask extension answering semantic KOL queries."""
+
+    def __init__(self, app=None):
+        self._base = None
+        self._current = None
+        self._delta = {}  # kol_id -> vector, or None once deleted
+        self._cursor = 0
+        self._synced_at = 0.0
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('KOL_SEARCH_DIR', os.path.join(app.instance_path, 'kol_search'))
+        app.config.setdefault('KOL_SEARCH_NPROBE', 16)
+        app.config.setdefault('KOL_SEARCH_MAX_FILTER_IDS', 100000)
+        app.config.setdefault('KOL_SEARCH_SYNC_SECONDS', 2)
+        app.extensions['kol_search'] = self
+        app.cli.add_command(search_index_command)
+
+    def available(self):
+        return os.path.exists(os.path.join(current_app.config['KOL_SEARCH_DIR'], 'CURRENT'))
+
+    def _sync(self):
+        """Load the newest build and apply KOL changes recorded since."""
+        config = current_app.config
+        if time.monotonic() - self._synced_at < config['KOL_SEARCH_SYNC_SECONDS'] and self._base is not None:
+            return
+
+        with self._lock:
+            with open(os.path.join(config['KOL_SEARCH_DIR'], 'CURRENT')) as f:
+                current = f.read().strip()
+            if current != self._current:
+                self._base = _Base(os.path.join(config['KOL_SEARCH_DIR'], current))
+                self._current = current
+                self._delta = {}
+                self._cursor = self._base.meta['last_seq']
+
+            # Readers iterate the delta without the lock, so swap in a new dict
+            delta = dict(self._delta)
+            feed = current_app.extensions['change_feed']
+            while True:
+                changes = feed.read(since=self._cursor, entity='kol')
+                if not changes:
+                    break
+                for change in changes:
+                    if change.op == 'delete':
+                        delta[change.entity_id] = None
+                    else:
+                        delta[change.entity_id] = embed(kol_text(change.payload.get('name'), change.payload.get('bio')))
+                self._cursor = changes[-1].id
+            self._delta = delta
+            self._synced_at = time.monotonic()
+
+    def search(self, text, limit=20, oversample=10, allowed=None):
+        """Return [(kol_id, score)] best first, `limit * oversample` at most.
+
+        `allowed`, a sorted array of KOL ids, restricts the results to those
+        KOLs before ranking. If it is smaller than what the IVF probe would
+        read, every allowed row is scored; otherwise more lists are probed
+        until `limit` allowed matches are found or all lists were read.
+        """
+        self._sync()
+        query = embed(text)
+        if not query.any():
+            return []
+
+        base, delta = self._base, self._delta
+        if allowed is not None:
+            allowed = np.asarray(allowed, dtype=np.int64)
+        nlist = len(base.centroids)
+        nprobe = min(current_app.config['KOL_SEARCH_NPROBE'], nlist)
+
+        if allowed is not None and len(allowed) <= base.meta['count'] * nprobe / nlist:
+            positions = base.positions(allowed)
+            scores, ids = self._collect([(base.vectors[positions] @ query, base.ids[positions])],
+                                        delta, query, allowed)
+        else:
+            lists = np.argsort(-(base.centroids @ query), kind='stable')
+            while True:
+                parts = [
+                    (base.vectors[start:end] @ query, base.ids[start:end])
+                    for start, end in ((base.offsets[c], base.offsets[c + 1]) for c in lists[:nprobe])
+                    if start < end
+                ]
+                scores, ids = self._collect(parts, delta, query, allowed)
+                if allowed is None or len(ids) >= limit or nprobe == nlist:
+                    break
+                nprobe = min(nprobe * 4, nlist)
+
+        top = np.argsort(-scores, kind='stable')[:limit * oversample]
+        return [(int(ids[i]), float(scores[i])) for i in top]
+
+    def _collect(self, parts, delta, query, allowed):
+        """Merge (scores, ids) parts of the base with the delta.
+
+        Keeps positive scores of allowed KOLs only; returns (scores, ids).
+        """
+        scores, ids = [part[0] for part in parts], [part[1] for part in parts]
+
+        if delta and scores:
+            # Base rows edited or deleted since the build are superseded by the delta
+            base_scores, base_ids = np.concatenate(scores), np.concatenate(ids)
+            fresh = ~np.isin(base_ids, np.fromiter(delta.keys(), dtype=np.int64, count=len(delta)))
+            scores, ids = [base_scores[fresh]], [base_ids[fresh]]
+
+        live = [(kol_id, vector) for kol_id, vector in delta.items() if vector is not None]
+        if live:
+            scores.append(np.stack([vector for _, vector in live]) @ query)
+            ids.append(np.array([kol_id for kol_id, _ in live], dtype=np.int64))
+
+        if not scores:
+            return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.int64)
+        scores, ids = np.concatenate(scores), np.concatenate(ids)
+
+        keep = scores > 0
+        if allowed is not None:
+            keep &= _member(ids, allowed)
+        return scores[keep], ids[keep]
+
+    def build(self, batch_size=10000):
+        """Embed every KOL and write a new base index; returns the KOL count."""
+        config = current_app.config
+        root = config['KOL_SEARCH_DIR']
+        name = datetime.utcnow().strftime('build-%Y%m%d%H%M%S%f')
+        path = os.path.join(root, name)
+        os.makedirs(path)
+
+        # Changes after this sequence number are picked up from the feed;
+        # events that may still appear below it must not be skipped
+        query = db.session.query(db.func.coalesce(db.func.max(ChangeEvent.id), 0))
+        horizon = current_app.extensions['change_feed'].horizon()
+        if horizon is not None:
+            query = query.filter(ChangeEvent.id < horizon)
+        last_seq = query.scalar()
+        count = KOL.query.count()
+
+        raw_path = os.path.join(path, 'raw.f32')
+        raw = np.memmap(raw_path, dtype=np.float32, mode='w+', shape=(max(count, 1), DIM))
+        ids = np.zeros(count, dtype=np.int64)
+        row = 0
+        for kol_id, kol_name, bio in db.session.query(KOL.id, KOL.name, KOL.bio).order_by(KOL.id).yield_per(batch_size):
+            if row == count:
+                break
+            raw[row] = embed(kol_text(kol_name, bio))
+            ids[row] = kol_id
+            row += 1
+        count = row
+
+        nlist = max(1, min(int(np.sqrt(count)), 4096)) if count else 1
+        if count:
+            rng = np.random.default_rng(0)
+            sample = raw[np.sort(rng.choice(count, size=min(count, 50 * nlist), replace=False))]
+            centroids = _kmeans(np.asarray(sample), nlist)
+            assignment = np.concatenate([
+                np.argmax(raw[start:start + batch_size] @ centroids.T, axis=1)
+                for start in range(0, count, batch_size)
+            ])
+        else:
+            centroids = np.zeros((1, DIM), dtype=np.float32)
+            assignment = np.zeros(0, dtype=np.int64)
+
+        # Group rows by list so each list is one contiguous slice
+        order = np.argsort(assignment, kind='stable')
+        offsets = np.zeros(nlist + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(assignment, minlength=nlist))
+
+        if count:
+            vectors = np.memmap(os.path.join(path, 'vectors.f32'), dtype=np.float32, mode='w+', shape=(count, DIM))
+            for start in range(0, count, batch_size):
+                vectors[start:start + batch_size] = raw[order[start:start + batch_size]]
+            vectors.flush()
+            del vectors
+        del raw
+        os.remove(raw_path)
+
+        ids[order].tofile(os.path.join(path, 'ids.i64'))
+        centroids.astype(np.float32).tofile(os.path.join(path, 'centroids.f32'))
+        offsets.tofile(os.path.join(path, 'offsets.i64'))
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump({'dim': DIM, 'count': count, 'nlist': nlist, 'last_seq': last_seq,
+                       'built_at': datetime.utcnow().isoformat()}, f)
+
+        # Point workers at the new build, then drop all but the previous one
+        with open(os.path.join(root, 'CURRENT.tmp'), 'w') as f:
+            f.write(name)
+        os.replace(os.path.join(root, 'CURRENT.tmp'), os.path.join(root, 'CURRENT'))
+        builds = sorted(entry for entry in os.listdir(root) if entry.startswith('build-'))
+        for old in builds[:-2]:
+            shutil.rmtree(os.path.join(root, old), ignore_errors=True)
+
+        return count
+
+
+@click.command('search-index')
+@with_appcontext
+def search_index_command():
+    """Rebuild the semantic KOL search index."""
+    count = current_app.extensions['kol_search'].build()
+    click.echo(f"Indexed {count} KOLs")
@@ -0,0 +1,266 @@
+"""
+In-process columnar snapshot of the kols table.
+
+KOL discovery is read-mostly, so each worker can keep the filterable
+columns of every KOL in NumPy arrays and answer `get_kols` filters and
+sorts with vectorized masks. The snapshot only decides which ids belong on
+the requested page; the rows themselves are still loaded from the database
+by primary key.
+
+The snapshot refreshes incrementally using `KOL.updated_at` as a
+watermark. `updated_at` is stamped before commit, so a row can become
+visible after a later-stamped one was already read; each refresh therefore
+re-reads KOL_SNAPSHOT_OVERLAP seconds before the watermark. Deletes are
+detected by comparing row counts, which triggers a full reload.
+
+Configuration:
+    KOL_SNAPSHOT_ENABLED      Turn the snapshot on (default False)
+    KOL_SNAPSHOT_MAX_BYTES    Memory limit for the column arrays
+    KOL_SNAPSHOT_MAX_AGE      Seconds before a read triggers a refresh
+    KOL_SNAPSHOT_OVERLAP      Seconds re-read before the watermark; longer
+                              than the slowest KOL write transaction
+    KOL_SNAPSHOT_CONSISTENCY  'eventual' serves from the snapshot,
+                              'strict' always falls back to SQL
+"""
+
+from datetime import timedelta
+import threading
+import time
+
+import numpy as np
+
+from models import db, KOL
+
+SORT_COLUMNS = ('followers', 'price_per_post', 'engagement_rate', 'created_at')
+
+
+class _Columns:
+    """One immutable version of the snapshot, sorted by id."""
+
+    def __init__(self, ids, category, platform, followers, price_per_post,
+                 engagement_rate, created_at, categories, platforms, watermark):
+        self.ids = ids
+        self.category = category
+        self.platform = platform
+        self.followers = followers
+        self.price_per_post = price_per_post
+        self.engagement_rate = engagement_rate
+        self.created_at = created_at
+        self.categories = categories  # code -> value
+        self.platforms = platforms
+        self.watermark = watermark
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in (
+            'ids', 'category', 'platform', 'followers',
+            'price_per_post', 'engagement_rate', 'created_at'
+        ))
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def _encode(values, dictionary):
+    """Dictionary-encode strings, extending `dictionary` in place."""
+    index = {value: code for code, value in enumerate(dictionary)}
+    codes = np.empty(len(values), dtype=np.int32)
+    for i, value in enumerate(values):
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(dictionary)
+            dictionary.append(value)
+        codes[i] = code
+    return codes
+
+
+def _floats(values):
+    """NULLs become NaN so comparisons exclude them, as in SQL."""
+    return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+
+def _timestamps(values):
+    """NULLs become NaT, stored as the smallest int64."""
+    return np.array(values, dtype='datetime64[us]').astype(np.int64)
+
+
+def _missing(values):
+    """Mask of the NULLs in a column built by `_floats` or `_timestamps`."""
+    if values.dtype.kind == 'f':
+        return np.isnan(values)
+    return values == np.iinfo(values.dtype).min
+
+
+class KOLSnapshot:
+    """Flask extension holding the per-process KOL snapshot."""
+
+    def __init__(self, app=None):
+        self._columns = None
+        self._loaded_at = 0.0
+        self._stale = True
+        self._disabled = False
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('KOL_SNAPSHOT_ENABLED', False)
+        app.config.setdefault('KOL_SNAPSHOT_MAX_BYTES', 64 * 1024 * 1024)
+        app.config.setdefault('KOL_SNAPSHOT_MAX_AGE', 30)
+        app.config.setdefault('KOL_SNAPSHOT_OVERLAP', 5)
+        app.config.setdefault('KOL_SNAPSHOT_CONSISTENCY', 'eventual')
+        app.extensions['kol_snapshot'] = self
+
+    def enabled(self, config):
+        return (
+            not self._disabled
+            and config['KOL_SNAPSHOT_ENABLED']
+            and config['KOL_SNAPSHOT_CONSISTENCY'] != 'strict'
+        )
+
+    def invalidate(self):
+        """Force a refresh on the next read in this process."""
+        self._stale = True
+
+    def columns(self, config):
+        """Return a current column set, refreshing it if needed.
+
+        Returns None when the snapshot cannot be used and the caller
+        should fall back to SQL.
+        """
+        if not self.enabled(config):
+            return None
+
+        expired = time.monotonic() - self._loaded_at > config['KOL_SNAPSHOT_MAX_AGE']
+        if self._columns is None or self._stale or expired:
+            # Only one thread refreshes; the others keep serving the old version
+            blocking = self._columns is None
+            if self._lock.acquire(blocking=blocking):
+                try:
+                    self._refresh(config)
+                finally:
+                    self._lock.release()
+
+        return self._columns
+
+    def _refresh(self, config):
+        self._stale = False
+        current = self._columns
+
+        if current is None:
+            columns = self._load()
+        else:
+            columns = self._merge(current, timedelta(seconds=config['KOL_SNAPSHOT_OVERLAP']))
+            # Deleted rows never show up in the delta, so a count mismatch means reload
+            if len(columns) != db.session.query(db.func.count(KOL.id)).scalar():
+                columns = self._load()
+
+        if columns.nbytes > config['KOL_SNAPSHOT_MAX_BYTES']:
+            print(f"KOL snapshot disabled: {columns.nbytes} bytes exceeds KOL_SNAPSHOT_MAX_BYTES")
+            self._disabled = True
+            self._columns = None
+            return
+
+        self._columns = columns
+        self._loaded_at = time.monotonic()
+
+    def _fetch(self, since=None):
+        query = db.session.query(
+            KOL.id, KOL.category, KOL.platform, KOL.followers, KOL.price_per_post,
+            KOL.engagement_rate, KOL.created_at, KOL.updated_at
+        )
+        if since is not None:
+            # Rows in the overlap window are re-read; merging is idempotent
+            query = query.filter(KOL.updated_at >= since)
+        return query.order_by(KOL.id).all()
+
+    def _build(self, rows, categories, platforms, watermark):
+        ids, category, platform, followers, price, engagement, created, updated = (
+            zip(*rows) if rows else ([],) * 8
+        )
+        latest = max((u for u in updated if u is not None), default=None)
+        if watermark is None or (latest is not None and latest > watermark):
+            watermark = latest
+        return _Columns(
+            ids=np.array(ids, dtype=np.int64),
+            category=_encode(category, categories),
+            platform=_encode(platform, platforms),
+            followers=_floats(followers),
+            price_per_post=_floats(price),
+            engagement_rate=_floats(engagement),
+            created_at=_timestamps(created),
+            categories=categories,
+            platforms=platforms,
+            watermark=watermark
+        )
+
+    def _load(self):
+        return self._build(self._fetch(), [], [], None)
+
+    def _merge(self, current, overlap):
+        """Apply rows changed since `overlap` before the watermark to a copy of `current`."""
+        since = None if current.watermark is None else current.watermark - overlap
+        rows = self._fetch(since=since)
+        if not rows:
+            return current
+
+        delta = self._build(rows, list(current.categories), list(current.platforms), current.watermark)
+        names = ('ids', 'category', 'platform', 'followers',
+                 'price_per_post', 'engagement_rate', 'created_at')
+
+        # Drop the old versions of changed rows, then append and re-sort by id
+        keep = ~np.isin(current.ids, delta.ids)
+        merged = {name: np.concatenate([getattr(current, name)[keep], getattr(delta, name)])
+                  for name in names}
+        order = np.argsort(merged['ids'], kind='stable')
+
+        return _Columns(
+            categories=delta.categories,
+            platforms=delta.platforms,
+            watermark=delta.watermark,
+            **{name: values[order] for name, values in merged.items()}
+        )
+
+    def filter_mask(self, columns, category=None, platform=None, min_followers=None, max_price=None):
+        """Boolean mask of the rows matching the `get_kols` filters."""
+        mask = np.ones(len(columns), dtype=bool)
+        if category:
+            if category not in columns.categories:
+                return np.zeros(len(columns), dtype=bool)
+            mask &= columns.category == columns.categories.index(category)
+        if platform:
+            if platform not in columns.platforms:
+                return np.zeros(len(columns), dtype=bool)
+            mask &= columns.platform == columns.platforms.index(platform)
+        if min_followers:
+            mask &= columns.followers >= min_followers
+        if max_price:
+            mask &= columns.price_per_post <= max_price
+        return mask
+
+    def matching_ids(self, config, category=None, platform=None, min_followers=None, max_price=None):
+        """Sorted array of every id matching the filters, or None to fall back to SQL."""
+        columns = self.columns(config)
+        if columns is None:
+            return None
+        return columns.ids[self.filter_mask(columns, category, platform, min_followers, max_price)]
+
+    def search(self, config, category=None, platform=None, min_followers=None,
+               max_price=None, sort=None, order='asc', offset=0, limit=None):
+        """Return the ids of the requested page, or None to fall back to SQL."""
+        columns = self.columns(config)
+        if columns is None:
+            return None
+
+        mask = self.filter_mask(columns, category, platform, min_followers, max_price)
+        positions = np.flatnonzero(mask)
+        if sort in SORT_COLUMNS:
+            keys = getattr(columns, sort)[positions]
+            if order == 'desc':
+                keys = -keys
+            # NULLs last in both directions, as get_kols orders in SQL; ties
+            # are broken by id since lexsort is stable and arrays are sorted by id
+            positions = positions[np.lexsort((keys, _missing(keys)))]
+
+        end = None if limit is None else offset + limit
+        return columns.ids[positions[offset:end]].tolist()
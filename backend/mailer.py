@@ -0,0 +1,215 @@
+"""
+Pre-rendered email templates and a pooled batch sender.
+
+Templates live in templates/email as an HTML and a plain-text variant.
+Each is rendered once with markers in place of the per-recipient fields
+and split into static chunks, so rendering for a recipient is a single
+join of those chunks with the escaped field values. Per-recipient fields
+must therefore be output as-is in the template, without filters.
+
+`send_batch` streams recipients from any iterator through a bounded queue
+to a small pool of threads, each holding one SMTP connection.
+"""
+
+from datetime import datetime, timedelta
+from functools import lru_cache
+import os
+import queue
+import smtplib
+import threading
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from flask_mail import Message
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from markupsafe import escape
+
+from models import db, User, InfluencerInvite
+
+INVITE_EXPIRES_DAYS = 7
+
+_env = Environment(
+    loader=FileSystemLoader(os.path.join(os.path.dirname(__file__), 'templates', 'email')),
+    autoescape=select_autoescape(['html'])
+)
+_MARK = '\x00'
+
+
+class CompiledEmail:
+    """An email template rendered once and filled in per recipient."""
+
+    def __init__(self, name, subject, fields, context=None):
+        self.subject = subject
+        self.fields = tuple(fields)
+        self._html = self._compile(f'{name}.html', context, lambda value: str(escape(value)))
+        self._text = self._compile(f'{name}.txt', context, str)
+
+    def _compile(self, filename, context, quote):
+        markers = {field: f'{_MARK}{field}{_MARK}' for field in self.fields}
+        parts = _env.get_template(filename).render(**(context or {}), **markers).split(_MARK)
+        static, slots = parts[0::2], parts[1::2]
+        if not set(slots) <= set(self.fields):
+            raise ValueError(f'{filename}: per-recipient fields must not be filtered')
+        return static, slots, quote
+
+    @staticmethod
+    def _fill(compiled, values):
+        static, slots, quote = compiled
+        out = [static[0]]
+        for slot, text in zip(slots, static[1:]):
+            out.append(quote(values[slot]))
+            out.append(text)
+        return ''.join(out)
+
+    def render(self, **values):
+        """Return (text, html) for one recipient."""
+        return self._fill(self._text, values), self._fill(self._html, values)
+
+    def message(self, recipient, **values):
+        text, html = self.render(**values)
+        # Both bodies make Flask-Mail send multipart/alternative
+        return Message(subject=self.subject, recipients=[recipient], body=text, html=html)
+
+
+@lru_cache(maxsize=None)
+def get_template(name):
+    """Compiled templates, parsed once per process."""
+    if name == 'invite':
+        return CompiledEmail(
+            'invite',
+            subject="You're invited to join our KOL Platform",
+            fields=['registration_link'],
+            context={'expires_days': INVITE_EXPIRES_DAYS}
+        )
+    raise KeyError(name)
+
+
+def registration_link(token):
+    return f"{os.getenv('FRONTEND_URL', 'http://localhost:3000')}/influencer/register?token={token}"
+
+
+def invite_message(email, token):
+    return get_template('invite').message(email, registration_link=registration_link(token))
+
+
+class BatchResult:
+    def __init__(self):
+        self.sent = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+
+    def add(self, sent=0, failed=0):
+        with self._lock:
+            self.sent += sent
+            self.failed += failed
+
+
+def send_batch(template, recipients, connections=4, queue_size=1000):
+    """Send `template` to every (email, values) pair from `recipients`.
+
+    Memory stays flat however long the iterator is: at most `queue_size`
+    recipients are buffered. Returns a BatchResult with sent/failed counts.
+    """
+    app = current_app._get_current_object()
+    mail = app.extensions['mail']
+    pending = queue.Queue(maxsize=queue_size)
+    result = BatchResult()
+
+    def worker():
+        with app.app_context():
+            item = pending.get()
+            retrying = False
+            while item is not None:
+                try:
+                    with mail.connect() as connection:
+                        while item is not None:
+                            email, values = item
+                            try:
+                                connection.send(template.message(email, **values))
+                                result.add(sent=1)
+                            except smtplib.SMTPServerDisconnected:
+                                raise
+                            except smtplib.SMTPException as e:
+                                # The server refused this message; the connection is still usable
+                                print(f"Error sending email to {email}: {str(e)}")
+                                result.add(failed=1)
+                            except OSError:
+                                raise
+                            except Exception as e:
+                                # e.g. the template failed for these values; a dead worker
+                                # would leave the queue unconsumed and block the producer
+                                print(f"Error sending email to {email}: {str(e)}")
+                                result.add(failed=1)
+                            item, retrying = pending.get(), False
+                except Exception as e:
+                    if item is None:
+                        # quit() failed after the last message; nothing is in flight
+                        print(f"Error closing SMTP connection: {str(e)}")
+                    elif not retrying:
+                        # Connection failed or dropped, e.g. the server closed it while
+                        # idle: reconnect and send the message in flight once more
+                        print(f"Error sending email to {item[0]}, reconnecting: {str(e)}")
+                        retrying = True
+                    else:
+                        print(f"Error sending email to {item[0]}: {str(e)}")
+                        result.add(failed=1)
+                        item, retrying = pending.get(), False
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(connections)]
+    for thread in threads:
+        thread.start()
+    for recipient in recipients:
+        pending.put(recipient)
+    for _ in threads:
+        pending.put(None)
+    for thread in threads:
+        thread.join()
+
+    return result
+
+
+@click.command('send-invites')
+@click.argument('emails', type=click.File())
+@click.option('--inviter', required=True, help='Email of the admin sending the invites.')
+@click.option('--connections', default=4, show_default=True, help='Parallel SMTP connections.')
+@click.option('--chunk-size', default=1000, show_default=True, help='Invites created per transaction.')
+@with_appcontext
+def send_invites_command(emails, inviter, connections, chunk_size):
+    """Create and email invites for every address in EMAILS (one per line)."""
+    admin = User.query.filter_by(email=inviter, role='admin').first()
+    if not admin:
+        raise click.ClickException(f'No admin with email {inviter}')
+
+    def recipients():
+        chunk = []
+        for line in emails:
+            if line.strip():
+                chunk.append(line.strip())
+            if len(chunk) == chunk_size:
+                yield from create_invites(chunk)
+                chunk = []
+        if chunk:
+            yield from create_invites(chunk)
+
+    def create_invites(addresses):
+        now = datetime.utcnow()
+        # Same rule as send_influencer_invite: one active invite per email
+        active = {email for (email,) in db.session.query(InfluencerInvite.email).filter(
+            InfluencerInvite.email.in_(addresses),
+            InfluencerInvite.status == 'pending',
+            InfluencerInvite.expires_at > now
+        )}
+        tokens = {email: InfluencerInvite.generate_token() for email in addresses if email not in active}
+        db.session.add_all([
+            InfluencerInvite(email=email, token=token, invited_by=admin.id,
+                             expires_at=now + timedelta(days=INVITE_EXPIRES_DAYS))
+            for email, token in tokens.items()
+        ])
+        db.session.commit()
+        return [(email, {'registration_link': registration_link(token)}) for email, token in tokens.items()]
+
+    started = datetime.utcnow()
+    result = send_batch(get_template('invite'), recipients(), connections=connections)
+    elapsed = (datetime.utcnow() - started).total_seconds() or 1
+    click.echo(f"Sent {result.sent}, failed {result.failed} ({result.sent / elapsed:.0f} emails/s)")
@@ -0,0 +1,39 @@
+"""stamp change events with the database clock
+
+Revision ID: 7b3e9d2a4c61
+Revises: 609fa34a0e52
+Create Date: 2026-10-19 15:02:11.408213
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b3e9d2a4c61'
+down_revision = '609fa34a0e52'
+branch_labels = None
+depends_on = None
+
+
+def _utc_now():
+    # Same expression as models.utc_now
+    if op.get_bind().dialect.name == 'postgresql':
+        return sa.text("TIMEZONE('utc', CLOCK_TIMESTAMP())")
+    return sa.text('CURRENT_TIMESTAMP')
+
+
+def upgrade():
+    with op.batch_alter_table('change_events', schema=None) as batch_op:
+        batch_op.alter_column('created_at',
+               existing_type=sa.DateTime(),
+               server_default=_utc_now(),
+               existing_nullable=True)
+
+
+def downgrade():
+    with op.batch_alter_table('change_events', schema=None) as batch_op:
+        batch_op.alter_column('created_at',
+               existing_type=sa.DateTime(),
+               server_default=None,
+               existing_nullable=True)
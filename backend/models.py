@@ -1,10 +1,30 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
 from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
 import secrets
 
 db = SQLAlchemy()
 
+
+class utc_now(FunctionElement):
+    """The database server's current UTC time as a naive timestamp."""
+    type = db.DateTime()
+    inherit_cache = True
+
+
+@compiles(utc_now, 'postgresql')
+def _pg_utc_now(element, compiler, **kw):
+    # Wall clock at evaluation, not transaction start; columns are timestamp without time zone
+    return "TIMEZONE('utc', CLOCK_TIMESTAMP())"
+
+
+@compiles(utc_now)
+def _utc_now(element, compiler, **kw):
+    return 'CURRENT_TIMESTAMP'
+
+
 class User(db.Model):
     __tablename__ = 'users'
     
@@ -34,6 +54,9 @@ class User(db.Model):
 class KOL(db.Model):
     __tablename__ = 'kols'
     
+    # Name given to influencers who register without linking Instagram
+    PLACEHOLDER_NAME = 'New Influencer'
+    
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
@@ -63,6 +86,9 @@ class KOL(db.Model):
     campaigns = db.relationship('Campaign', backref='kol', lazy=True)
     
     def to_dict(self):
+        # Imported here so importing the models does not load the HTTP client
+        from image_cache import image_url
+        
         return {
             'id': self.id,
             'name': self.name,
@@ -73,6 +99,7 @@ class KOL(db.Model):
             'engagement_rate': self.engagement_rate,
             'bio': self.bio,
             'profile_image': self.profile_image,
+            'profile_image_thumbnail': image_url(self.profile_image),
             'price_per_post': self.price_per_post,
             'verified': self.verified,
             'instagram_id': self.instagram_id,
@@ -86,6 +113,10 @@ class KOL(db.Model):
 
 class Campaign(db.Model):
     __tablename__ = 'campaigns'
+    __table_args__ = (
+        # Serves every tenant-scoped lookup: by user, by user and status, newest first
+        db.Index('ix_campaigns_user_status_created', 'user_id', 'status', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
@@ -101,6 +132,11 @@ class Campaign(db.Model):
     
     user = db.relationship('User', backref='campaigns')
     
+    @classmethod
+    def for_user(cls, user_id):
+        """Query scoped to one client's campaigns; all campaign routes go through this."""
+        return cls.query.filter(cls.user_id == user_id)
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -129,6 +165,7 @@ class InfluencerInvite(db.Model):
     expires_at = db.Column(db.DateTime, nullable=False)
     used_at = db.Column(db.DateTime, nullable=True)
     kol_id = db.Column(db.Integer, db.ForeignKey('kols.id'), nullable=True)
+    completion_key = db.Column(db.String(100), nullable=True)  # idempotency key of the completing request
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     inviter = db.relationship('User', backref='sent_invites')
@@ -152,3 +189,40 @@ class InfluencerInvite(db.Model):
             'created_at': self.created_at.isoformat()
         }
 
+
+
+class KOLSignature(db.Model):
+    __tablename__ = 'kol_signatures'
+    
+    kol_id = db.Column(db.Integer, db.ForeignKey('kols.id', ondelete='CASCADE'), primary_key=True)
+    minhash = db.Column(db.LargeBinary, nullable=True)  # MinHash of the bio, None if too short
+    cluster_id = db.Column(db.Integer, nullable=False, index=True)  # lowest kol_id in the duplicate cluster
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class KOLDedupKey(db.Model):
+    __tablename__ = 'kol_dedup_keys'
+    
+    key = db.Column(db.String(64), primary_key=True)  # blocking key: normalized name, handle or LSH band
+    kol_id = db.Column(db.Integer, db.ForeignKey('kols.id', ondelete='CASCADE'), primary_key=True, index=True)
+
+
+class ChangeEvent(db.Model):
+    __tablename__ = 'change_events'
+    
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True)  # feed sequence number
+    entity = db.Column(db.String(20), nullable=False)  # kol, campaign, invite
+    entity_id = db.Column(db.Integer, nullable=False)
+    op = db.Column(db.String(10), nullable=False)  # insert, update, upsert, delete
+    payload = db.Column(db.JSON, nullable=True)
+    created_at = db.Column(db.DateTime, server_default=utc_now(), index=True)  # database clock
+    
+    def to_dict(self):
+        return {
+            'seq': self.id,
+            'entity': self.entity,
+            'entity_id': self.entity_id,
+            'op': self.op,
+            'payload': self.payload,
+            'created_at': self.created_at.isoformat()
+        }
@@ -0,0 +1,297 @@
+"""
+Slow-query log and query-plan regression check.
+
+Every statement executed through SQLAlchemy is timed by engine events.
+Statements slower than SLOW_QUERY_MS are written as one JSON object per
+line to SLOW_QUERY_LOG (stdout when unset), together with the endpoint
+that ran them. Parameters are never logged.
+
+`flask query-check` requests a fixed set of read-only endpoints against
+the configured, seeded database, captures each endpoint's statements and
+EXPLAINs them. The result is compared with a stored baseline: a check
+fails when an endpoint runs more statements, its plan cost grows by more
+than QUERY_BASELINE_TOLERANCE, or it scans a table it did not scan
+before. Plan costs are only available on PostgreSQL; on SQLite only
+statement counts and table scans are compared.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+import json
+import os
+import threading
+import time
+
+import click
+from flask import current_app, has_app_context, has_request_context, request
+from flask.cli import with_appcontext
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from models import db, User, KOL, Campaign
+
+# (name, path, who); paths are filled in from the seeded data
+SCENARIOS = (
+    ('kols.list', '/api/kols?limit=50', None),
+    ('kols.filtered', '/api/kols?category=fashion&platform=instagram&min_followers=10000'
+                      '&sort=followers&order=desc&limit=50', None),
+    ('kols.detail', '/api/kols/{kol_id}', None),
+    ('kols.similar', '/api/kols/{kol_id}/similar', None),
+    ('kols.facets', '/api/kols/facets?platform=instagram', None),
+    ('kols.duplicates', '/api/kols/duplicates', 'admin'),
+    ('campaigns.list', '/api/campaigns', 'client'),
+    ('campaigns.detail', '/api/campaigns/{campaign_id}', 'client'),
+    ('stats', '/api/stats', 'client'),
+    ('changes', '/api/changes?limit=100', 'admin'),
+    ('invites.list', '/api/invites', 'admin'),
+    ('auth.me', '/api/auth/me', 'client'),
+)
+
+_capture = ContextVar('query_capture', default=None)
+_log_lock = threading.Lock()
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info['query_started'] = time.perf_counter()
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    ms = (time.perf_counter() - conn.info['query_started']) * 1000
+
+    captured = _capture.get()
+    if captured is not None:
+        captured.append({'statement': statement, 'parameters': parameters,
+                         'executemany': executemany, 'ms': ms})
+
+    if has_app_context() and ms >= current_app.config['SLOW_QUERY_MS']:
+        _log_slow(statement, ms, executemany)
+
+
+def _log_slow(statement, ms, executemany):
+    entry = {
+        'at': datetime.utcnow().isoformat(),
+        'ms': round(ms, 2),
+        'statement': ' '.join(statement.split()),
+        'executemany': executemany,
+        'endpoint': request.endpoint if has_request_context() else None,
+        'method': request.method if has_request_context() else None,
+        'path': request.path if has_request_context() else None
+    }
+    path = current_app.config['SLOW_QUERY_LOG']
+    if not path:
+        print(f"Slow query: {json.dumps(entry)}")
+        return
+    with _log_lock:
+        # One write per line; O_APPEND keeps lines from several workers intact
+        with open(path, 'a') as f:
+            f.write(json.dumps(entry) + '\n')
+
+
+@contextmanager
+def capture():
+    """Collect the statements run inside the block.
+
+    Yields a list of {'statement', 'parameters', 'executemany', 'ms'},
+    filled as statements execute; usable from tests as well.
+    """
+    captured = []
+    token = _capture.set(captured)
+    try:
+        yield captured
+    finally:
+        _capture.reset(token)
+
+
+def _walk(node):
+    yield node
+    for child in node.get('Plans', []):
+        yield from _walk(child)
+
+
+def explain(statement, parameters):
+    """Return {'cost', 'scans', 'plan'} for one SELECT statement.
+
+    `scans` lists the tables read in full. `cost` is the planner's total
+    cost on PostgreSQL and None elsewhere.
+    """
+    tables = set(db.metadata.tables)
+    with db.engine.connect() as connection:
+        cursor = connection.connection.cursor()
+        try:
+            if connection.dialect.name == 'postgresql':
+                cursor.execute('EXPLAIN (FORMAT JSON) ' + statement, parameters)
+                plan = cursor.fetchone()[0]
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                root = plan[0]['Plan']
+                scans = [node['Relation Name'] for node in _walk(root)
+                         if node['Node Type'] == 'Seq Scan' and node.get('Relation Name') in tables]
+                return {'cost': root['Total Cost'], 'scans': sorted(scans), 'plan': plan}
+
+            cursor.execute('EXPLAIN QUERY PLAN ' + statement, parameters)
+            details = [row[-1] for row in cursor.fetchall()]
+            # "SCAN kols" reads the table; "SCAN kols USING INDEX ..." does not
+            scans = [detail.split()[1] for detail in details
+                     if detail.startswith('SCAN ') and ' USING ' not in detail
+                     and detail.split()[1] in tables]
+            return {'cost': None, 'scans': sorted(scans), 'plan': details}
+        finally:
+            cursor.close()
+
+
+def _is_query(statement):
+    return statement.lstrip().split(None, 1)[0].upper() in ('SELECT', 'WITH')
+
+
+class QueryGuard:
+    """Flask extension timing statements and checking endpoint query plans."""
+
+    def __init__(self, app=None):
+        self._listening = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('SLOW_QUERY_MS', 250)
+        app.config.setdefault('SLOW_QUERY_LOG', None)
+        app.config.setdefault('QUERY_BASELINE', os.path.join(app.root_path, 'query_baseline.json'))
+        app.config.setdefault('QUERY_BASELINE_TOLERANCE', 0.2)
+        app.extensions['query_guard'] = self
+        app.cli.add_command(query_check_command)
+        if not self._listening:
+            event.listen(Engine, 'before_cursor_execute', _before_execute)
+            event.listen(Engine, 'after_cursor_execute', _after_execute)
+            self._listening = True
+
+    def _fixtures(self):
+        """Users and ids the scenarios run with: the largest tenant and an admin."""
+        admin = User.query.filter_by(role='admin').order_by(User.id).first()
+        top = db.session.query(Campaign.user_id).group_by(Campaign.user_id).order_by(
+            db.func.count().desc(), Campaign.user_id
+        ).first()
+        client = db.session.get(User, top[0]) if top else \
+            User.query.filter_by(role='client').order_by(User.id).first()
+        if admin is None or client is None:
+            raise click.ClickException('query-check needs a seeded database with an admin and a client')
+
+        campaign = Campaign.for_user(client.id).order_by(Campaign.id).first()
+        kol = KOL.query.order_by(KOL.id).first()
+        return {
+            'tokens': {
+                'admin': create_access_token(identity=str(admin.id)),
+                'client': create_access_token(identity=str(client.id))
+            },
+            'ids': {'kol_id': kol.id if kol else 0, 'campaign_id': campaign.id if campaign else 0}
+        }
+
+    def profile(self, scenarios=SCENARIOS):
+        """Request every scenario and return {name: endpoint report}."""
+        app = current_app._get_current_object()
+        fixtures = self._fixtures()
+        db.session.rollback()
+
+        # Measure the database, not this process's caches
+        snapshot_enabled = app.config['KOL_SNAPSHOT_ENABLED']
+        app.config['KOL_SNAPSHOT_ENABLED'] = False
+        client = app.test_client()
+        report = {}
+        try:
+            for name, path, who in scenarios:
+                app.extensions['kol_facets'].invalidate()
+                headers = {'Authorization': f"Bearer {fixtures['tokens'][who or 'client']}"}
+                with capture() as statements:
+                    response = client.get(path.format(**fixtures['ids']), headers=headers)
+
+                queries = []
+                for item in statements:
+                    query = {'statement': ' '.join(item['statement'].split()), 'ms': round(item['ms'], 2)}
+                    if not item['executemany'] and _is_query(item['statement']):
+                        query.update(explain(item['statement'], item['parameters']))
+                    queries.append(query)
+
+                costs = [query['cost'] for query in queries if query.get('cost') is not None]
+                report[name] = {
+                    'status': response.status_code,
+                    'statements': len(queries),
+                    'cost': round(sum(costs), 2) if costs else None,
+                    'scans': sorted({table for query in queries for table in query.get('scans', [])}),
+                    'ms': round(sum(query['ms'] for query in queries), 2),
+                    'queries': queries
+                }
+        finally:
+            app.config['KOL_SNAPSHOT_ENABLED'] = snapshot_enabled
+        return report
+
+    def compare(self, report, baseline, tolerance):
+        """Return a list of regressions of `report` against `baseline`."""
+        failures = []
+        for name, result in report.items():
+            if result['status'] >= 400:
+                failures.append(f"{name}: returned {result['status']}")
+            expected = baseline.get(name)
+            if expected is None:
+                continue
+
+            if result['statements'] > expected['statements']:
+                failures.append(f"{name}: {result['statements']} statements, baseline {expected['statements']}")
+            if result['cost'] is not None and expected['cost'] is not None \
+                    and result['cost'] > expected['cost'] * (1 + tolerance):
+                failures.append(f"{name}: plan cost {result['cost']}, baseline {expected['cost']}")
+            new_scans = set(result['scans']) - set(expected['scans'])
+            if new_scans:
+                failures.append(f"{name}: new full scan of {', '.join(sorted(new_scans))}")
+        return failures
+
+
+def _baseline_entry(result):
+    return {key: result[key] for key in ('statements', 'cost', 'scans')}
+
+
+@click.command('query-check')
+@click.option('--baseline', type=click.Path(dir_okay=False), help='Baseline file [default: QUERY_BASELINE].')
+@click.option('--update-baseline', is_flag=True, help='Store this run as the new baseline.')
+@click.option('--report', type=click.Path(dir_okay=False), help='Write statements, timings and plans here.')
+@with_appcontext
+def query_check_command(baseline, update_baseline, report):
+    """Check endpoint statement counts and query plans against the baseline."""
+    guard = current_app.extensions['query_guard']
+    baseline = baseline or current_app.config['QUERY_BASELINE']
+    dialect = db.engine.dialect.name
+    results = guard.profile()
+
+    if report:
+        with open(report, 'w') as f:
+            json.dump({'dialect': dialect, 'endpoints': results}, f, indent=2, default=str)
+
+    for name, result in results.items():
+        cost = '-' if result['cost'] is None else result['cost']
+        click.echo(f"{name:<18} {result['status']}  {result['statements']:>3} statements  "
+                   f"cost {cost}  {result['ms']:.1f}ms  scans: {', '.join(result['scans']) or '-'}")
+
+    if update_baseline:
+        failing = [f"{name} ({result['status']})" for name, result in results.items() if result['status'] >= 400]
+        if failing:
+            raise click.ClickException(f"Not updating the baseline; failing endpoints: {', '.join(failing)}")
+        with open(baseline, 'w') as f:
+            json.dump({'dialect': dialect,
+                       'endpoints': {name: _baseline_entry(result) for name, result in results.items()}},
+                      f, indent=2, sort_keys=True)
+            f.write('\n')
+        click.echo(f"Baseline written to {baseline}")
+        return
+
+    if not os.path.exists(baseline):
+        raise click.ClickException(f'No baseline at {baseline}; create one with --update-baseline')
+    with open(baseline) as f:
+        stored = json.load(f)
+    if stored['dialect'] != dialect:
+        raise click.ClickException(f"Baseline was recorded on {stored['dialect']}, not {dialect}")
+
+    failures = guard.compare(results, stored['endpoints'], current_app.config['QUERY_BASELINE_TOLERANCE'])
+    for failure in failures:
+        click.echo(f"REGRESSION {failure}", err=True)
+    if failures:
+        raise click.ClickException(f'{len(failures)} query regressions')
+    click.echo("No query regressions")
@@ -1,6 +1,7 @@
 """
 Seed script to populate the database with sample data.
 Run this after setting up the database to add some test KOLs and data.
+For large volumes use `flask --app app seed` instead.
 
 Usage:
     python seed_data.py
@@ -8,6 +9,7 @@ Usage:
 
 from app import app
 from models import db, User, KOL, Campaign
+from seeder import clear_data
 from datetime import datetime, timedelta
 from werkzeug.security import generate_password_hash
 
@@ -17,10 +19,7 @@ def seed_database():
         
         # Clear existing data (optional - comment out if you want to keep existing data)
         print("Clearing existing data...")
-        Campaign.query.delete()
-        KOL.query.delete()
-        User.query.delete()
-        db.session.commit()
+        clear_data()
         
         # Create sample users
         print("Creating sample users...")
@@ -0,0 +1,470 @@
+"""
+Bulk generator of realistic, deterministic seed data.
+
+Every table is generated in fixed-size chunks. Chunk N of a table draws
+from its own random stream derived from (seed, table, N) and owns a fixed
+id range, so the data depends only on the seed and the plan, never on the
+number of workers or on how often a run was interrupted. Foreign keys are
+drawn from the id ranges of the tables seeded before, without reading them
+back.
+
+Chunks are generated with NumPy and written in one statement each: COPY on
+PostgreSQL, executemany elsewhere. A process pool runs the chunks of one
+table in parallel; tables run in dependency order. Completed chunks are
+recorded in a JSON checkpoint, and re-running the same command resumes
+where it stopped.
+
+Seeded rows are written below the ORM, so they do not appear in the change
+feed. Rebuild the dedup and search indexes afterwards.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import base64
+import csv
+from datetime import datetime, timedelta
+import io
+import json
+import os
+import tempfile
+import time
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+import numpy as np
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.pool import NullPool
+from werkzeug.security import generate_password_hash
+
+from models import db, User, KOL, Campaign, InfluencerInvite, ChangeEvent
+
+SEED_PASSWORD = 'seed1234'
+ADMIN_EVERY = 50  # users base+1, base+51, ... are admins
+
+FIRST_NAMES = (
+    'Sarah Mike Emily David Jessica Alex Olivia Ryan Sophie James Mia Daniel Chloe Lucas Grace '
+    'Ethan Ava Noah Lily Liam Zoe Mateo Hana Kenji Priya Arjun Fatima Omar Lena Jonas Ines '
+    'Tomas Yuki Min Wei Aisha Carlos Elena Marco Nina'
+).split()
+LAST_NAMES = (
+    'Johnson Chen Rodriguez Kim Brown Turner Martinez Thompson Anderson Wilson Lee Garcia Patel '
+    'Nguyen Silva Muller Rossi Tanaka Khan Cohen Novak Larsen Dubois Okafor Santos Ivanova '
+    'Moreau Schmidt Haddad Costa Walker Wright Lopez Park Singh Ali Berg Fischer Romero Sato'
+).split()
+CITIES = (
+    'NYC', 'LA', 'London', 'Paris', 'Berlin', 'Tokyo', 'Seoul', 'Singapore', 'Sydney', 'Toronto',
+    'Austin', 'Miami', 'Lisbon', 'Madrid', 'Milan', 'Dubai', 'Mumbai', 'Sao Paulo'
+)
+
+CATEGORIES = ('fashion', 'tech', 'fitness', 'food', 'beauty', 'travel', 'lifestyle', 'gaming')
+CATEGORY_WEIGHTS = (0.18, 0.12, 0.14, 0.13, 0.15, 0.1, 0.1, 0.08)
+PLATFORMS = ('instagram', 'youtube', 'tiktok', 'twitter')
+PLATFORM_WEIGHTS = (0.45, 0.2, 0.28, 0.07)
+
+BIO_PHRASES = {
+    'fashion': ('Fashion influencer & style consultant.', 'Sustainable fashion advocate.',
+                'Streetwear drops and outfit ideas.', 'Styling vintage and thrifted pieces.',
+                'Capsule wardrobes on a budget.', 'Runway recaps and trend forecasts.',
+                'Modest fashion and layering tips.', 'Sneaker collector and reseller.'),
+    'tech': ('Tech reviewer & software engineer.', 'Unboxing the latest gadgets.',
+             'Explaining tech trends in plain words.', 'Developer advocate sharing web development tips.',
+             'Smart home setups and automation.', 'Phone cameras tested side by side.',
+             'Building PCs for every budget.', 'AI tools for everyday productivity.'),
+    'fitness': ('Personal trainer & nutrition coach.', 'Sharing workout routines and healthy recipes.',
+                'Marathon runner reviewing running gear.', 'Yoga instructor & wellness advocate.',
+                'Strength training for beginners.', 'Home workouts with no equipment.',
+                'Cycling, climbing and trail runs.', 'Pilates and mobility coach.'),
+    'food': ('Food blogger & restaurant critic.', 'Quick and easy recipes for busy people.',
+             'Exploring the best street food around the world.', 'Plant-based chef and home baker.',
+             'Meal prep ideas for the week.', 'Coffee nerd and latte art.',
+             'Family dinners under 30 minutes.', 'Wine pairings and cheese boards.'),
+    'beauty': ('Makeup artist & beauty guru.', 'Skincare routines for sensitive skin.',
+               'Tutorials, reviews, and beauty tips.', 'Clean beauty and cruelty-free products.',
+               'Nail art and salon trends.', 'Haircare for curly hair.',
+               'Drugstore dupes of luxury products.', 'Fragrance reviews and layering.'),
+    'travel': ('Travel photographer & digital nomad.', 'Budget travel tips and itineraries.',
+               'Capturing the world one destination at a time.', 'Luxury hotels and hidden gems.',
+               'Van life and road trips.', 'Solo travel safety tips.',
+               'Island hopping and dive spots.', 'City breaks in 48 hours.'),
+    'lifestyle': ('Home decor and everyday lifestyle.', 'Parenting, family life and routines.',
+                  'Minimalism and personal finance.', 'Plants, coffee and slow living.',
+                  'Small apartment makeovers.', 'Journaling and productivity.',
+                  'Dog mom and pet care tips.', 'Weekend DIY projects.'),
+    'gaming': ('Streamer and competitive gamer.', 'Indie game reviews and walkthroughs.',
+               'Esports commentary and highlights.', 'Retro gaming and hardware mods.',
+               'Speedruns and challenge runs.', 'Cozy games and chill streams.',
+               'Mobile gaming tips and tier lists.', 'Tabletop and board game nights.')
+}
+BIO_HOOKS = (
+    'New videos every week.', 'Daily stories.', 'Brand collabs welcome.', 'Posting since {year}.',
+    'Featured in local press.', 'Community first.', 'Honest reviews only.', 'Ex-agency, now independent.',
+    'Lives on coffee.', 'Dog and cat person.', 'Weekend content creator.', 'Building in public.'
+)
+INTERESTS = (
+    'hiking surfing skiing tennis padel climbing cycling boxing chess anime kpop jazz vinyl '
+    'photography film ceramics knitting gardening baking sushi ramen tacos espresso matcha '
+    'wine cocktails sneakers watches cars motorbikes camping fishing birding astronomy '
+    'podcasts poetry books languages history design architecture interiors plants dogs cats '
+    'horses sailing diving running yoga pilates dance theatre comedy travel startups investing'
+).split()
+# Surnames of KOLs are synthesized so names rarely collide, even at millions of rows
+SYLLABLES = (
+    'ka ri mo se lan dor vi ne ta bel sor min ha ro li gan '
+    'fe za tor ul ben ki no wel ar pa rin du sel mar co ven'
+).split()
+DUPLICATE_RATE = 0.01  # KOLs that re-register under an existing KOL's name and bio
+
+CAMPAIGN_ADJECTIVES = ('Summer', 'Holiday', 'Spring', 'Back to School', 'Black Friday', 'Launch',
+                       'Always-On', 'Awareness', 'Flash', 'Loyalty')
+CAMPAIGN_TYPES = ('Collection Launch', 'Product Review Series', 'Challenge', 'Partnership',
+                  'Giveaway', 'Ambassador Program', 'Unboxing', 'Takeover')
+CAMPAIGN_STATUSES = ('draft', 'active', 'completed', 'cancelled')
+CAMPAIGN_STATUS_WEIGHTS = (0.2, 0.3, 0.4, 0.1)
+INVITE_STATUSES = ('pending', 'completed', 'expired')
+INVITE_STATUS_WEIGHTS = (0.5, 0.3, 0.2)
+
+TABLES = ('users', 'kols', 'campaigns', 'invites')
+MODELS = {'users': User, 'kols': KOL, 'campaigns': Campaign, 'invites': InfluencerInvite}
+COLUMNS = {
+    'users': ('id', 'email', 'password_hash', 'full_name', 'role', 'created_at'),
+    'kols': ('id', 'name', 'email', 'category', 'platform', 'followers', 'engagement_rate', 'bio',
+             'price_per_post', 'verified', 'instagram_username', 'consent_given', 'consent_given_at',
+             'registration_completed', 'created_at', 'updated_at'),
+    'campaigns': ('id', 'title', 'description', 'budget', 'start_date', 'end_date', 'status',
+                  'kol_id', 'user_id', 'created_at', 'updated_at'),
+    'invites': ('id', 'email', 'token', 'invited_by', 'status', 'expires_at', 'used_at', 'kol_id',
+                'created_at')
+}
+
+
+def _pick(rng, values, n, weights=None):
+    return np.asarray(values, dtype=object)[rng.choice(len(values), size=n, p=weights)]
+
+
+def _timestamps(as_of, seconds):
+    return [as_of - timedelta(seconds=s) for s in seconds.tolist()]
+
+
+def _id_range(plan, table):
+    base = plan['base'][table]
+    return base + 1, base + plan['counts'][table]
+
+
+def _users(rng, ids, plan):
+    n = len(ids)
+    as_of = datetime.fromisoformat(plan['as_of'])
+    first, last = _pick(rng, FIRST_NAMES, n), _pick(rng, LAST_NAMES, n)
+    roles = np.where((ids - plan['base']['users'] - 1) % ADMIN_EVERY == 0, 'admin', 'client')
+    created = _timestamps(as_of, rng.uniform(0, 730 * 86400, n))
+    return [
+        (user_id, f'{f}.{l}.{user_id}@example.com'.lower(), plan['password_hash'], f'{f} {l}', role, c)
+        for user_id, f, l, role, c in zip(ids.tolist(), first, last, roles.tolist(), created)
+    ]
+
+
+def _surnames(rng, n):
+    parts = rng.integers(0, len(SYLLABLES), (n, 3)).tolist()
+    return [f'{SYLLABLES[a]}{SYLLABLES[b]}{SYLLABLES[c]}'.title() for a, b, c in parts]
+
+
+def _kols(rng, ids, plan):
+    n = len(ids)
+    as_of = datetime.fromisoformat(plan['as_of'])
+    first, last = _pick(rng, FIRST_NAMES, n), _surnames(rng, n)
+    categories = _pick(rng, CATEGORIES, n, CATEGORY_WEIGHTS)
+    platforms = _pick(rng, PLATFORMS, n, PLATFORM_WEIGHTS)
+
+    # Heavy-tailed audiences; engagement falls and price rises with reach
+    followers = np.clip(rng.lognormal(np.log(20000), 1.5, n), 500, 50_000_000).astype(np.int64)
+    engagement = np.clip(8 * (followers / 10000) ** -0.2 * rng.lognormal(0, 0.35, n), 0.2, 25).round(2)
+    price = np.maximum(np.round(followers / 1000 * rng.lognormal(np.log(8), 0.5, n), -1), 50)
+    verified = rng.random(n) < np.clip(0.05 + 0.15 * np.log10(followers / 1000), 0.02, 0.95)
+
+    phrases = rng.integers(0, len(next(iter(BIO_PHRASES.values()))), n)
+    interests = rng.integers(0, len(INTERESTS), (n, 4)).tolist()
+    hooks = np.where(rng.random(n) < 0.4, _pick(rng, BIO_HOOKS, n), '')
+    cities = _pick(rng, CITIES, n)
+    years = rng.integers(2012, 2025, n)
+    bios = [
+        f"{BIO_PHRASES[c][a]} Into {INTERESTS[i]}, {INTERESTS[j]}, {INTERESTS[k]} and {INTERESTS[m]}. "
+        f"{hook.format(year=year) + ' ' if hook else ''}{city} based, collabs via {f.lower()}@{l.lower()}.studio"
+        for c, a, (i, j, k, m), hook, year, city, f, l in zip(
+            categories, phrases.tolist(), interests, hooks, years.tolist(), cities, first, last
+        )
+    ]
+    names = [f'{f} {l}' for f, l in zip(first, last)]
+
+    # Plant duplicates of earlier KOLs in the chunk so dedup has something to find
+    for i in np.flatnonzero(rng.random(n) < DUPLICATE_RATE).tolist():
+        if i:
+            source = int(rng.integers(0, i))
+            names[i], bios[i] = names[source], bios[source]
+
+    age = rng.uniform(0, 730 * 86400, n)
+    created = _timestamps(as_of, age)
+    updated = _timestamps(as_of, age * rng.random(n))
+    registered = rng.random(n) < 0.3
+    consent_at = _timestamps(as_of, age * rng.uniform(0.5, 1, n))
+
+    return [
+        (kol_id, name, f'{name.replace(" ", ".")}.{kol_id}@example.com'.lower(), category, platform,
+         int(fol), float(er), bio, float(p), bool(v),
+         f'{name.replace(" ", "")}{kol_id}'.lower() if platform == 'instagram' else None,
+         bool(r), ca if r else None, bool(r), c, u)
+        for kol_id, name, category, platform, fol, er, bio, p, v, r, ca, c, u in zip(
+            ids.tolist(), names, categories, platforms, followers.tolist(), engagement.tolist(),
+            bios, price.tolist(), verified.tolist(), registered.tolist(), consent_at, created, updated
+        )
+    ]
+
+
+def _campaigns(rng, ids, plan):
+    n = len(ids)
+    as_of = datetime.fromisoformat(plan['as_of'])
+    first_user, last_user = _id_range(plan, 'users')
+    first_kol, last_kol = _id_range(plan, 'kols')
+
+    # Squaring skews campaigns towards low user ids, giving tenants of very different sizes
+    users = first_user + (rng.random(n) ** 2 * (last_user - first_user + 1)).astype(np.int64)
+    kols = rng.integers(first_kol, last_kol + 1, n) if last_kol >= first_kol else np.zeros(n, dtype=np.int64)
+    has_kol = (rng.random(n) < 0.85) & (last_kol >= first_kol)
+
+    adjectives = _pick(rng, CAMPAIGN_ADJECTIVES, n)
+    categories = _pick(rng, CATEGORIES, n, CATEGORY_WEIGHTS)
+    types = _pick(rng, CAMPAIGN_TYPES, n)
+    statuses = _pick(rng, CAMPAIGN_STATUSES, n, CAMPAIGN_STATUS_WEIGHTS)
+    budgets = np.round(rng.lognormal(np.log(3000), 0.8, n), -2)
+
+    age = rng.uniform(0, 730 * 86400, n)
+    created = _timestamps(as_of, age)
+    starts = _timestamps(as_of, age - rng.uniform(0, 30 * 86400, n))
+    lengths = rng.integers(7, 91, n).tolist()
+    updated = _timestamps(as_of, age * rng.random(n))
+
+    return [
+        (campaign_id, f'{adjective} {category.title()} {kind}',
+         f'{kind} with {category} creators for our {adjective.lower()} push.',
+         float(budget), start, start + timedelta(days=length), status,
+         kol if with_kol else None, user, c, u)
+        for campaign_id, adjective, category, kind, budget, start, length, status, kol, with_kol, user, c, u in zip(
+            ids.tolist(), adjectives, categories, types, budgets.tolist(), starts, lengths,
+            statuses, kols.tolist(), has_kol.tolist(), users.tolist(), created, updated
+        )
+    ]
+
+
+def _invites(rng, ids, plan):
+    n = len(ids)
+    as_of = datetime.fromisoformat(plan['as_of'])
+    first_user, last_user = _id_range(plan, 'users')
+    first_kol, last_kol = _id_range(plan, 'kols')
+
+    admins = (last_user - first_user) // ADMIN_EVERY + 1
+    inviters = first_user + rng.integers(0, admins, n) * ADMIN_EVERY
+    first, last = _pick(rng, FIRST_NAMES, n), _pick(rng, LAST_NAMES, n)
+    statuses = _pick(rng, INVITE_STATUSES, n, INVITE_STATUS_WEIGHTS)
+    raw = rng.bytes(32 * n)
+    tokens = [base64.urlsafe_b64encode(raw[i * 32:(i + 1) * 32]).rstrip(b'=').decode() for i in range(n)]
+    kols = rng.integers(first_kol, last_kol + 1, n) if last_kol >= first_kol else np.zeros(n, dtype=np.int64)
+
+    # Pending invites are still inside their 7-day window
+    age = np.where(statuses == 'pending', rng.uniform(0, 7 * 86400, n), rng.uniform(7 * 86400, 365 * 86400, n))
+    created = _timestamps(as_of, age)
+    used = _timestamps(as_of, age - rng.uniform(0, 7 * 86400, n))
+
+    rows = []
+    for invite_id, f, l, token, inviter, status, c, u, kol in zip(
+        ids.tolist(), first, last, tokens, inviters.tolist(), statuses, created, used, kols.tolist()
+    ):
+        completed = status == 'completed'
+        rows.append((invite_id, f'{f}.{l}.{invite_id}@example.com'.lower(), token, inviter, status,
+                     c + timedelta(days=7), u if completed else None,
+                     kol if completed and last_kol >= first_kol else None, c))
+    return rows
+
+
+GENERATORS = {'users': _users, 'kols': _kols, 'campaigns': _campaigns, 'invites': _invites}
+
+
+def _write(connection, table, columns, rows):
+    if connection.dialect.name == 'postgresql':
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        buffer.seek(0)
+        cursor = connection.connection.cursor()
+        cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    else:
+        connection.execute(table.insert(), [dict(zip(columns, row)) for row in rows])
+
+
+_engines = {}
+
+
+def _engine(url):
+    # One engine per worker process; NullPool so nothing is shared across a fork
+    if url not in _engines:
+        _engines[url] = create_engine(url, poolclass=NullPool)
+    return _engines[url]
+
+
+def seed_chunk(url, plan, table, chunk):
+    """Generate and write one chunk; returns (table, chunk, rows written)."""
+    size = plan['chunk_size']
+    start = plan['base'][table] + chunk * size
+    count = min(size, plan['counts'][table] - chunk * size)
+    ids = np.arange(start + 1, start + count + 1, dtype=np.int64)
+    model = MODELS[table].__table__
+
+    with _engine(url).begin() as connection:
+        # A chunk that committed before its checkpoint was saved is not written twice
+        existing = connection.execute(
+            select(func.count()).select_from(model).where(model.c.id.between(int(ids[0]), int(ids[-1])))
+        ).scalar()
+        if existing == count:
+            return table, chunk, 0
+        if existing:
+            raise RuntimeError(f'{table} ids {ids[0]}-{ids[-1]} are partly taken by other rows')
+
+        rng = np.random.default_rng([plan['seed'], TABLES.index(table), chunk])
+        _write(connection, model, COLUMNS[table], GENERATORS[table](rng, ids, plan))
+    return table, chunk, count
+
+
+def clear_data():
+    """Delete every row of every application table except the change feed.
+
+    Feed consumers keep a cursor into change_events; restarting its
+    sequence (or, on SQLite, emptying the table) would hand out sequence
+    numbers they have already passed, so the feed is left as it is.
+    """
+    tables = [table for table in db.metadata.sorted_tables if table.name != ChangeEvent.__tablename__]
+    if db.engine.dialect.name == 'postgresql':
+        db.session.execute(text(f"TRUNCATE {', '.join(t.name for t in tables)} RESTART IDENTITY CASCADE"))
+    else:
+        for table in reversed(tables):
+            db.session.execute(table.delete())
+    db.session.commit()
+
+
+def make_plan(counts, seed, chunk_size, as_of):
+    """Fix the id range of every table, reserving it on PostgreSQL."""
+    if counts['invites'] and not counts['users']:
+        raise ValueError('Invites need seeded users to invite them')
+    if counts['campaigns'] and not counts['users']:
+        raise ValueError('Campaigns need seeded users to own them')
+
+    base = {}
+    for table in TABLES:
+        model = MODELS[table].__table__
+        base[table] = db.session.execute(select(func.coalesce(func.max(model.c.id), 0))).scalar()
+        if db.engine.dialect.name == 'postgresql':
+            # Move the sequence past the range so concurrent inserts cannot take seeded ids
+            db.session.execute(text("SELECT setval(pg_get_serial_sequence(:table, 'id'), :last)"),
+                               {'table': model.name, 'last': base[table] + max(counts[table], 1)})
+    db.session.commit()
+
+    return {
+        'seed': seed,
+        'chunk_size': chunk_size,
+        'as_of': as_of.isoformat(),
+        'counts': counts,
+        'base': base,
+        'password_hash': generate_password_hash(SEED_PASSWORD, method='pbkdf2:sha256'),
+        'done': {table: [] for table in TABLES}
+    }
+
+
+def _save(path, plan):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or '.')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(plan, f)
+    os.replace(tmp, path)
+
+
+def run(plan, checkpoint, workers=1, echo=print):
+    """Seed every chunk not yet recorded in `plan`, saving progress to `checkpoint`.
+
+    Returns the number of rows written.
+    """
+    url = db.engine.url.render_as_string(hide_password=False)
+    if db.engine.dialect.name == 'sqlite':
+        workers = 1  # SQLite allows one writer at a time
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    total = 0
+
+    try:
+        for table in TABLES:
+            chunks = -(-plan['counts'][table] // plan['chunk_size'])
+            pending = [chunk for chunk in range(chunks) if chunk not in set(plan['done'][table])]
+            started, written = time.perf_counter(), 0
+
+            if executor:
+                results = (future.result() for future in as_completed(
+                    executor.submit(seed_chunk, url, plan, table, chunk) for chunk in pending
+                ))
+            else:
+                results = (seed_chunk(url, plan, table, chunk) for chunk in pending)
+
+            for _, chunk, count in results:
+                plan['done'][table].append(chunk)
+                written += count
+                _save(checkpoint, plan)
+
+            total += written
+            elapsed = time.perf_counter() - started
+            if pending:
+                echo(f"{table}: {written} rows in {elapsed:.1f}s ({written / (elapsed or 1e-9):.0f} rows/s)")
+            else:
+                echo(f"{table}: already seeded")
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+    return total
+
+
+@click.command('seed')
+@click.option('--users', default=1000, show_default=True)
+@click.option('--kols', default=100000, show_default=True)
+@click.option('--campaigns', default=200000, show_default=True)
+@click.option('--invites', default=10000, show_default=True)
+@click.option('--seed', default=0, show_default=True, help='Same seed and counts give the same data.')
+@click.option('--as-of', type=click.DateTime(), help='Date the generated history ends at [default: today].')
+@click.option('--workers', default=os.cpu_count() or 1, show_default=True, help='Parallel writer processes.')
+@click.option('--chunk-size', default=10000, show_default=True, help='Rows per transaction.')
+@click.option('--checkpoint', type=click.Path(dir_okay=False), help='Progress file [default: instance/seed-checkpoint.json].')
+@click.option('--reset', is_flag=True, help='Delete all existing data (except the change feed) first.')
+@with_appcontext
+def seed_command(users, kols, campaigns, invites, seed, as_of, workers, chunk_size, checkpoint, reset):
+    """Generate large volumes of realistic data, resuming an interrupted run."""
+    checkpoint = checkpoint or os.path.join(current_app.instance_path, 'seed-checkpoint.json')
+    counts = {'users': users, 'kols': kols, 'campaigns': campaigns, 'invites': invites}
+
+    if reset:
+        clear_data()
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+
+    if os.path.exists(checkpoint):
+        with open(checkpoint) as f:
+            plan = json.load(f)
+        if plan['counts'] != counts or plan['seed'] != seed or plan['chunk_size'] != chunk_size:
+            raise click.ClickException(f'{checkpoint} is from a run with other options; '
+                                       'repeat those options, or delete it to start over')
+        click.echo(f"Resuming from {checkpoint}")
+    else:
+        as_of = as_of or datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        try:
+            plan = make_plan(counts, seed, chunk_size, as_of)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        _save(checkpoint, plan)
+
+    started = time.perf_counter()
+    total = run(plan, checkpoint, workers=workers, echo=click.echo)
+    os.remove(checkpoint)
+
+    elapsed = time.perf_counter() - started
+    click.echo(f"Seeded {total} rows in {elapsed:.1f}s ({total / (elapsed or 1e-9):.0f} rows/s)")
+    click.echo(f"Seeded users log in with password '{SEED_PASSWORD}'; "
+               "run dedup-index and search-index to index the new KOLs")
@@ -20,5 +20,6 @@ fi
 
 echo "Setup complete!"
 echo "To activate the virtual environment, run: source venv/bin/activate"
+echo "To create the database schema, run: flask --app app db upgrade"
 echo "To start the server, run: python app.py"
 
@@ -0,0 +1,48 @@
+"""
+Test fixtures.
+
+Tests that need PostgreSQL run against TEST_DATABASE_URL and are skipped
+when it is unset. The database is migrated to head before the session and
+back to base afterwards, so point it at a scratch database.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+TEST_DATABASE_URL = os.environ.get('TEST_DATABASE_URL')
+# app.py builds a module-level app on import; keep it off the real database
+os.environ['DATABASE_URL'] = TEST_DATABASE_URL or 'sqlite://'
+
+from app import create_app  # noqa: E402
+from config import Config  # noqa: E402
+from models import db  # noqa: E402
+
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = TEST_DATABASE_URL
+    SQLALCHEMY_ENGINE_OPTIONS = {'pool_size': 20, 'max_overflow': 10}
+    KOL_SNAPSHOT_ENABLED = False
+    DEDUP_ENABLED = False
+
+
+@pytest.fixture(scope='session')
+def pg_app(tmp_path_factory):
+    """App bound to the PostgreSQL test database, migrated to head."""
+    if not TEST_DATABASE_URL or not TEST_DATABASE_URL.startswith('postgresql'):
+        pytest.skip('TEST_DATABASE_URL is not a PostgreSQL database')
+    from flask_migrate import downgrade, upgrade
+
+    TestConfig.IMAGE_CACHE_DIR = str(tmp_path_factory.mktemp('image_cache'))
+    TestConfig.KOL_SEARCH_DIR = str(tmp_path_factory.mktemp('kol_search'))
+    app = create_app(TestConfig)
+    migrations = os.path.join(app.root_path, 'migrations')
+    with app.app_context():
+        upgrade(directory=migrations)
+    yield app
+    with app.app_context():
+        db.session.remove()
+        downgrade(directory=migrations, revision='base')
@@ -0,0 +1,83 @@
+"""
+Change feed ordering under concurrent transactions.
+
+A transaction that starts writing first but records its event last must
+not end up below a cursor a consumer has already moved past: the feed
+holds later events back until it has finished.
+"""
+
+import threading
+import uuid
+
+from flask_jwt_extended import create_access_token
+import pytest
+from sqlalchemy import text
+
+from models import db, User, KOL, ChangeEvent
+
+
+def new_kol():
+    handle = uuid.uuid4().hex
+    return KOL(name=f'Feed {handle}', email=f'{handle}@example.com', category='tech', platform='instagram')
+
+
+@pytest.fixture
+def cursor(pg_app):
+    with pg_app.app_context():
+        yield db.session.query(db.func.coalesce(db.func.max(ChangeEvent.id), 0)).scalar()
+        db.session.remove()
+
+
+def test_events_committed_late_are_not_skipped(pg_app, cursor):
+    feed = pg_app.extensions['change_feed']
+    started, recorded, finish = threading.Event(), threading.Event(), threading.Event()
+
+    def slow_writer():
+        with pg_app.app_context():
+            # Take a transaction id now, record the event after the other commit
+            db.session.execute(text('SELECT pg_current_xact_id()'))
+            started.set()
+            finish.wait(10)
+            kol = new_kol()
+            db.session.add(kol)
+            db.session.commit()
+            recorded.kol_id = kol.id
+            recorded.set()
+            db.session.remove()
+
+    thread = threading.Thread(target=slow_writer)
+    thread.start()
+    try:
+        assert started.wait(10)
+        with pg_app.app_context():
+            kol = new_kol()
+            db.session.add(kol)
+            db.session.commit()
+            fast_id = kol.id
+
+            # Committed, but the slow transaction may still record a lower id
+            assert [e.entity_id for e in feed.read(since=cursor, entity='kol')] == []
+            db.session.rollback()
+    finally:
+        finish.set()
+        thread.join()
+
+    assert recorded.is_set()
+    with pg_app.app_context():
+        events = feed.read(since=cursor, entity='kol')
+        assert [e.entity_id for e in events] == [recorded.kol_id, fast_id]
+        assert all(e.id > cursor for e in events)
+
+
+def test_limit_is_at_least_one(pg_app, cursor):
+    with pg_app.app_context():
+        admin = User(email=f'admin-{uuid.uuid4().hex}@example.com', full_name='Admin', role='admin')
+        admin.set_password('admin1234')
+        db.session.add_all([admin, new_kol(), new_kol()])
+        db.session.commit()
+        token = create_access_token(identity=str(admin.id))
+
+    response = pg_app.test_client().get(f'/api/changes?since={cursor}&limit=-1',
+                                        headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 200
+    assert len(response.get_json()['changes']) == 1
@@ -0,0 +1,102 @@
+"""
+Concurrent completion of one influencer invite.
+
+N clients submit /api/invites/complete for the same invite at once. The
+invite row lock must serialize them: exactly one KOL is created, the
+invite is completed once and points at it, and retries carrying the
+winner's idempotency key replay its 200 response.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import threading
+import uuid
+
+import pytest
+
+from models import db, User, KOL, InfluencerInvite
+
+CLIENTS = 16
+
+
+@pytest.fixture
+def invite(pg_app):
+    with pg_app.app_context():
+        admin = User(email=f'admin-{uuid.uuid4().hex}@example.com', full_name='Admin', role='admin')
+        admin.set_password('admin1234')
+        db.session.add(admin)
+        db.session.flush()
+        invite = InfluencerInvite(
+            email=f'kol-{uuid.uuid4().hex}@example.com',
+            token=InfluencerInvite.generate_token(),
+            invited_by=admin.id,
+            expires_at=datetime.utcnow() + timedelta(days=7)
+        )
+        db.session.add(invite)
+        db.session.commit()
+        yield {'id': invite.id, 'token': invite.token, 'email': invite.email}
+        db.session.remove()
+
+
+def complete_concurrently(app, token, keys):
+    """POST one completion per key, all released together; returns responses."""
+    barrier = threading.Barrier(len(keys))
+    username = f'kol_{uuid.uuid4().hex[:12]}'
+
+    def complete(key):
+        client = app.test_client()
+        barrier.wait()
+        response = client.post('/api/invites/complete', headers={'Idempotency-Key': key}, json={
+            'token': token,
+            'consent_given': True,
+            'instagram_data': {'id': username, 'username': username, 'followers_count': 1200}
+        })
+        return response.status_code, response.get_json()
+
+    with ThreadPoolExecutor(max_workers=len(keys)) as pool:
+        return list(pool.map(complete, keys))
+
+
+def assert_completed_once(app, invite):
+    with app.app_context():
+        kols = KOL.query.filter_by(email=invite['email']).all()
+        assert len(kols) == 1
+        stored = db.session.get(InfluencerInvite, invite['id'])
+        assert stored.status == 'completed'
+        assert stored.kol_id == kols[0].id
+        assert stored.used_at is not None
+        completed = InfluencerInvite.query.filter_by(email=invite['email'], status='completed').count()
+        assert completed == 1
+        return kols[0].id, stored.completion_key
+
+
+def test_same_key_completes_once_and_replays(pg_app, invite):
+    key = uuid.uuid4().hex
+    responses = complete_concurrently(pg_app, invite['token'], [key] * CLIENTS)
+
+    kol_id, completion_key = assert_completed_once(pg_app, invite)
+    assert completion_key == key
+    assert [status for status, _ in responses] == [200] * CLIENTS
+    assert {body['kol']['id'] for _, body in responses} == {kol_id}
+
+
+def test_different_keys_complete_once(pg_app, invite):
+    keys = [uuid.uuid4().hex for _ in range(CLIENTS)]
+    responses = complete_concurrently(pg_app, invite['token'], keys)
+
+    kol_id, completion_key = assert_completed_once(pg_app, invite)
+    winners = [body for status, body in responses if status == 200]
+    assert len(winners) == 1
+    assert winners[0]['kol']['id'] == kol_id
+    assert sorted(status for status, _ in responses) == [200] + [400] * (CLIENTS - 1)
+    assert completion_key in keys
+
+    # The winner's retry replays its result; the losers' keys still fail
+    client = pg_app.test_client()
+    body = {'token': invite['token'], 'consent_given': True}
+    replay = client.post('/api/invites/complete', headers={'Idempotency-Key': completion_key}, json=body)
+    assert replay.status_code == 200
+    assert replay.get_json()['kol']['id'] == kol_id
+    loser = next(key for key in keys if key != completion_key)
+    assert client.post('/api/invites/complete', headers={'Idempotency-Key': loser},
+                       json=body).status_code == 400
@@ -36,6 +36,7 @@ export interface KOL {
   engagement_rate: number;
   bio: string;
   profile_image?: string;
+  profile_image_thumbnail?: string;
   price_per_post: number;
   verified: boolean;
   created_at: string;